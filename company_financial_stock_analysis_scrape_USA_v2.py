@@ -10,40 +10,94 @@ with improved error handling, structure, and parallel processing.
 
 import os
 import pandas as pd
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
+import requests
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.common.exceptions import (TimeoutException, WebDriverException,
+                                        NoSuchElementException, StaleElementReferenceException)
 from urllib.parse import urlparse, parse_qs
-from concurrent.futures import ThreadPoolExecutor
 from queue import Queue
 import threading
 import time
+from stock_analysis_driver_pool import DriverPool
+from stock_analysis_browser_profile import configure_chrome_options, driver_setup_for
+from stock_analysis_manifest import OutputManifest
+from stock_analysis_http_fetch import HttpFetcher
+from stock_analysis_parser import (parse_financials_page, is_raw_units,
+                                   split_currency_fiscal, CURRENCY_DIV_CLASS)
+from stock_analysis_async_engine import AsyncScrapeEngine, REPORT_TYPES
+from stock_analysis_adaptive_scheduler import AdaptiveScheduler
+from stock_analysis_html_cache import HtmlCache
+from stock_analysis_refresh_planner import RefreshPlanner
+from stock_analysis_work_journal import WorkJournal
+from stock_analysis_output_writer import OutputWriter
+from stock_analysis_dataset import FinancialDataset
+from stock_analysis_negative_cache import (NegativeCache, is_final, ticker_reason, BROWSER_ERROR,
+                                           NOT_FOUND, NO_TABLE, TIMEOUT)
 
 class FinancialDataScraper:
-    def __init__(self, chromedriver_path, input_file, output_folder, max_workers=5):
-        """Initialize the scraper with configuration parameters."""
+    def __init__(self, chromedriver_path, input_file, output_folder, max_workers=5,
+                 max_pages_per_driver=200, max_driver_memory_mb=1500,
+                 fetch_mode='selenium', base_url=None, cache_folder=None,
+                 refresh_state_file=None, refresh_ttl_days=30, combined_session=True,
+                 browser_profile='default', journal_file=None, write_behind=True,
+                 dataset_folder=None, market=None):
+        """
+        Initialize the scraper with configuration parameters.
+
+        fetch_mode 'http' reads the server-rendered table over plain HTTP and
+        only opens a browser for pages where that fails. base_url replaces the
+        host of every URL, e.g. with a local fixture server. Every fetched
+        page is kept in cache_folder when given, so it can be reparsed later.
+        refresh_state_file enables get_tickers_to_refresh. combined_session
+        scrapes both periods from one page load when both need a browser.
+        browser_profile 'lean' blocks resources the table does not need.
+        journal_file keeps per-report progress in a durable work queue so an
+        interrupted run can be resumed. write_behind hands finished tables to
+        a writer thread so browser threads never wait on disk; call
+        close_outputs() before reading the results. dataset_folder also
+        appends every saved table to the columnar dataset under market.
+        """
         self.chromedriver_path = chromedriver_path
         self.input_file = input_file
         self.output_folder = output_folder
         self.max_workers = max_workers
-        self.chrome_options = self.configure_chrome_options()
+        self.chrome_options = self.configure_chrome_options(browser_profile)
         self.lock = threading.Lock()
+        self.manifest = OutputManifest(output_folder)
+        # Long-lived browsers shared by the worker threads
+        self.driver_pool = DriverPool(chromedriver_path, self.chrome_options,
+                                      max_size=max_workers,
+                                      max_pages=max_pages_per_driver,
+                                      max_memory_mb=max_driver_memory_mb,
+                                      driver_setup=driver_setup_for(browser_profile))
+        self.fetch_mode = fetch_mode
+        self.combined_session = combined_session
+        # Browser sessions whose Raw unit preference has been set and verified
+        self.raw_unit_sessions = set()
+        self.unit_stats = {'clicks': 0, 'click_time': 0.0, 'skips': 0, 'check_time': 0.0}
+        self.base_url = base_url
+        self.html_cache = HtmlCache(cache_folder) if cache_folder else None
+        self.http_fetcher = HttpFetcher(base_url=base_url, pool_size=max_workers,
+                                        cache=self.html_cache)
+        self.refresh_planner = (RefreshPlanner(refresh_state_file, ttl_days=refresh_ttl_days)
+                                if refresh_state_file else None)
+        self.journal = WorkJournal(journal_file) if journal_file else None
+        # Tickers with nothing scrapeable are skipped until their entry expires
+        self.negative_cache = NegativeCache(output_folder)
+        # (ticker, report_type) -> negative cache reason of the last failed attempt
+        self.report_failures = {}
+        self.output_writer = OutputWriter(self._write_outputs) if write_behind else None
+        self.dataset = FinancialDataset(dataset_folder) if dataset_folder else None
+        self.market = market
+        self.http_hits = 0
+        self.selenium_fallbacks = 0
         
     @staticmethod
-    def configure_chrome_options():
-        """Configure Chrome WebDriver options."""
-        options = Options()
-        options.add_argument("--headless")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--window-size=1920,1080")
-        options.add_argument("--disable-dev-shm-usage")
-        return options
+    def configure_chrome_options(profile='default'):
+        """Configure Chrome WebDriver options. 'lean' blocks images, fonts, ads and analytics."""
+        return configure_chrome_options(profile)
     
     def get_missing_tickers(self):
         """Identify tickers with missing financial data."""
@@ -53,103 +107,324 @@ class FinancialDataScraper:
         df_cleaned = df.dropna(subset=['Symbol', 'Link']).drop_duplicates(subset=['Symbol', 'Link'])
         ticker_symbols = df_cleaned[['Symbol', 'Link']].values.tolist()
         
-        missing_tickers_link = []
-        for ticker, link in ticker_symbols:
-            annual_excel = os.path.join(self.output_folder, f"{ticker}_annual_financial_data.xlsx")
-            quarterly_excel = os.path.join(self.output_folder, f"{ticker}_quarterly_financial_data.xlsx")
-            
-            annual_csv = os.path.join(self.output_folder, f"{ticker}_annual_financial_data.csv")
-            quarterly_csv = os.path.join(self.output_folder, f"{ticker}_quarterly_financial_data.csv")
-            
-            if not ((os.path.exists(annual_excel) or os.path.exists(annual_csv)) and
-                    (os.path.exists(quarterly_excel) or os.path.exists(quarterly_csv))):
-                missing_tickers_link.append(link)
+        if self.manifest.is_empty():
+            self.manifest.rebuild()
+        complete = self.manifest.complete_tickers()
+        skipped = self.negative_cache.active()
+        missing_tickers_link = [link for ticker, link in ticker_symbols
+                                if ticker not in complete and ticker not in skipped]
         
         with self.lock:
-            print(f"Found {len(missing_tickers_link)} missing tickers")
+            print(f"Found {len(missing_tickers_link)} missing tickers "
+                  f"({len(skipped)} skipped by the negative cache)")
         return missing_tickers_link
 
+    def get_tickers_to_refresh(self):
+        """
+        Missing tickers plus those the refresh planner considers stale.
+        Existing files without a recorded scrape seed the planner state.
+        """
+        missing_links = self.get_missing_tickers()
+        if self.refresh_planner is None:
+            return missing_links
+
+        df = pd.read_csv(self.input_file)
+        df_cleaned = df.dropna(subset=['Symbol', 'Link']).drop_duplicates(subset=['Symbol', 'Link'])
+        missing = set(missing_links)
+        links = {}
+        for ticker, link in df_cleaned[['Symbol', 'Link']].values.tolist():
+            if link in missing:
+                continue
+            links[ticker] = link
+            if ticker not in self.refresh_planner.state:
+                for report_type in ('quarterly', 'annual'):
+                    filename = os.path.join(self.output_folder, f"{ticker}_{report_type}_financial_data.csv")
+                    if os.path.exists(filename):
+                        self.refresh_planner.record_file(filename, ticker, report_type)
+
+        skipped = self.negative_cache.active()
+        due = self.refresh_planner.plan([ticker for ticker in links if ticker not in skipped])
+        return missing_links + [links[ticker] for ticker in due]
+
+    @staticmethod
+    def _select_period(driver, report_type):
+        """Click the Quarterly/Annual tab if the page is not already on report_type."""
+        parsed_url = urlparse(driver.current_url)
+        query_params = parse_qs(parsed_url.query)
+        current = query_params['p'][0].lower() if 'p' in query_params else 'annual'
+        if current == report_type:
+            return
+        label = report_type.capitalize()
+        period_button = WebDriverWait(driver, 10).until(
+            EC.element_to_be_clickable((By.XPATH, f"//ul[contains(@class, 'navmenu submenu')]//button[text()='{label}']"))
+        )
+        period_button.click()
+        if report_type == 'quarterly':
+            WebDriverWait(driver, 10).until(
+                lambda driver: 'quarterly' in driver.current_url.lower()
+            )
+        else:
+            WebDriverWait(driver, 10).until(
+                lambda driver: 'quarterly' not in driver.current_url.lower()
+            )
+
+    @staticmethod
+    def _set_raw_units(driver):
+        """Switch the table to raw numbers through the 'Change number units' dropdown."""
+        dropdown_button = WebDriverWait(driver, 10).until(
+            EC.element_to_be_clickable((By.XPATH, "//button[@class='controls-btn' and @title='Change number units']"))
+        )
+        dropdown_button.click()
+        
+        dropdown_menu = WebDriverWait(driver, 5).until(
+            EC.presence_of_element_located((By.XPATH, "//div[contains(@class, 'absolute z-40')]"))
+        )
+
+        raw_option = WebDriverWait(driver, 5).until(
+            EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Raw')]"))
+        )
+        raw_option.click()
+
+    @staticmethod
+    def _shows_raw_units(driver):
+        """True when the currency/fiscal line of the current page reports raw values."""
+        try:
+            element = driver.find_element(By.XPATH, f"//div[@class='{CURRENCY_DIV_CLASS}']")
+            text = element.get_attribute('textContent')
+        except (NoSuchElementException, StaleElementReferenceException):
+            return False
+        currency, _ = split_currency_fiscal(text)
+        return is_raw_units(currency)
+
+    def _ensure_raw_units(self, driver):
+        """
+        Make sure the table shows raw values. The site remembers the units
+        choice per browser profile, so once a session has been switched to Raw
+        and verified, later pages only check the units line and fall back to
+        the dropdown when the check fails.
+        """
+        start = time.time()
+        if driver.session_id in self.raw_unit_sessions:
+            WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, "table")))
+            if self._shows_raw_units(driver):
+                with self.lock:
+                    self.unit_stats['skips'] += 1
+                    self.unit_stats['check_time'] += time.time() - start
+                return
+            start = time.time()
+
+        self._set_raw_units(driver)
+        WebDriverWait(driver, 5).until(EC.presence_of_element_located((By.TAG_NAME, "table")))
+        verified = self._shows_raw_units(driver)
+        with self.lock:
+            self.unit_stats['clicks'] += 1
+            self.unit_stats['click_time'] += time.time() - start
+            if verified:
+                self.raw_unit_sessions.add(driver.session_id)
+            else:
+                self.raw_unit_sessions.discard(driver.session_id)
+
+    def print_unit_summary(self):
+        """Report how much time skipping the units dropdown saved."""
+        stats = self.unit_stats
+        avg_click = stats['click_time'] / stats['clicks'] if stats['clicks'] else 0.0
+        avg_check = stats['check_time'] / stats['skips'] if stats['skips'] else 0.0
+        saved = (avg_click - avg_check) if stats['clicks'] and stats['skips'] else 0.0
+        print(f"Raw units: {stats['clicks']} dropdown clicks (avg {avg_click:.2f}s), "
+              f"{stats['skips']} skipped after check (avg {avg_check:.2f}s), "
+              f"avg {saved:.2f}s saved per skipped page")
+
+    @staticmethod
+    def _first_header_text(driver):
+        """Text of the table's first header row, '' while the table is being replaced."""
+        try:
+            return driver.find_element(By.CSS_SELECTOR, "table tr").text
+        except (NoSuchElementException, StaleElementReferenceException):
+            return ''
+
+    def _read_table(self, driver, url, ticker):
+        """Parse the table currently shown. Returns (DataFrame or None, currency)."""
+        page_source = driver.page_source
+        if self.html_cache is not None:
+            self.html_cache.store(url, page_source, ticker=ticker)
+        data, currency, _ = parse_financials_page(page_source)
+        return data, currency
+
     def _attempt_scrape(self, driver, url, ticker):
         """Attempt to scrape data from a specific URL."""
         try:
-            driver.get(url)
+            driver.get(self.http_fetcher.resolve(url))
             with self.lock:
                 print(f"Accessing {url} for {ticker}...")
 
             if "quarterly" in url:
-                parsed_url = urlparse(driver.current_url)
-                query_params = parse_qs(parsed_url.query)
-                if 'p' not in query_params or query_params['p'][0].lower() != 'quarterly':
-                    quarterly_button = WebDriverWait(driver, 10).until(
-                        EC.element_to_be_clickable((By.XPATH, "//ul[contains(@class, 'navmenu submenu')]//button[text()='Quarterly']"))
-                    )
-                    quarterly_button.click()
-                    WebDriverWait(driver, 10).until(
-                        lambda driver: 'quarterly' in driver.current_url.lower()
-                    )
-
-            dropdown_button = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.XPATH, "//button[@class='controls-btn' and @title='Change number units']"))
-            )
-            dropdown_button.click()
-            
-            dropdown_menu = WebDriverWait(driver, 5).until(
-                EC.presence_of_element_located((By.XPATH, "//div[contains(@class, 'absolute z-40')]"))
-            )
+                self._select_period(driver, 'quarterly')
 
-            raw_option = WebDriverWait(driver, 5).until(
-                EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Raw')]"))
-            )
-            raw_option.click()
-            
-            WebDriverWait(driver, 5).until(EC.presence_of_element_located((By.TAG_NAME, "table")))
-            
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
-            table = soup.find('table')
-            element = soup.find('div', class_="hidden pb-1 text-sm text-faded lg:block")
+            self._ensure_raw_units(driver)
             
-            currency = "N/A"
-            fiscal_year = "N/A"
-            if element:
-                currency_fiscal = element.text.split('.')
-                if currency_fiscal:
-                    currency = currency_fiscal[0].strip()
-                if len(currency_fiscal) > 1:
-                    fiscal_year = currency_fiscal[1].strip()
+            data, _ = self._read_table(driver, url, ticker)
+            if data is None:
+                self._note_failure(ticker, url, NO_TABLE)
+            return data
             
-            if table:
-                return self._process_table_data(table, currency, fiscal_year)
+        except TimeoutException as e:
+            with self.lock:
+                print(f"Error accessing {url} for {ticker}: {str(e)}")
+            # A loaded page without a table times out in the waits as well
+            self._note_failure(ticker, url, NO_TABLE if self._loaded_without_table(driver) else TIMEOUT)
             return None
-            
-        except (TimeoutException, WebDriverException) as e:
+        except WebDriverException as e:
             with self.lock:
                 print(f"Error accessing {url} for {ticker}: {str(e)}")
+            self._note_failure(ticker, url, BROWSER_ERROR)
             return None
 
+    @staticmethod
+    def _loaded_without_table(driver):
+        """True when the current page finished loading and has no <table>."""
+        try:
+            loaded = driver.execute_script("return document.readyState") == 'complete'
+            return loaded and not driver.find_elements(By.TAG_NAME, "table")
+        except WebDriverException:
+            return False
+
+    def _note_failure(self, ticker, url, reason):
+        """Remember why the last attempt at a report failed, for the negative cache."""
+        report_type = 'quarterly' if 'quarterly' in url else 'annual'
+        with self.lock:
+            self.report_failures[(ticker, report_type)] = reason
+
+    def scrape_both_periods(self, link, driver):
+        """
+        Scrape quarterly and annual tables in one page session: load the
+        quarterly page, set Raw units once, then switch to Annual in place.
+
+        Returns:
+            dict: report_type -> DataFrame or None
+        """
+        ticker = link.split('/')[-2].upper()
+        results = {'quarterly': None, 'annual': None}
+        quarterly_url = f"{link}financials/?p=quarterly"
+        annual_url = f"{link}financials/?p=annual"
+        try:
+            driver.get(self.http_fetcher.resolve(quarterly_url))
+            with self.lock:
+                print(f"Accessing {quarterly_url} for {ticker} (combined session)...")
+            self._select_period(driver, 'quarterly')
+            self._ensure_raw_units(driver)
+            results['quarterly'], _ = self._read_table(driver, quarterly_url, ticker)
+
+            # Switch periods in place and wait for the header row to change
+            quarterly_header = self._first_header_text(driver)
+            self._select_period(driver, 'annual')
+            WebDriverWait(driver, 10).until(
+                lambda driver: self._first_header_text(driver) not in ('', quarterly_header)
+            )
+            data, currency = self._read_table(driver, annual_url, ticker)
+            if data is not None and not is_raw_units(currency):
+                # The units setting did not survive the switch
+                self._set_raw_units(driver)
+                WebDriverWait(driver, 5).until(EC.presence_of_element_located((By.TAG_NAME, "table")))
+                data, _ = self._read_table(driver, annual_url, ticker)
+            results['annual'] = data
+        except (TimeoutException, WebDriverException) as e:
+            with self.lock:
+                print(f"Combined session failed for {ticker}: {str(e)}")
+        return results
+
+    def _attempt_http(self, link, report_type, ticker):
+        """Fetch a financials page without a browser. Returns None if Selenium is needed."""
+        url = f"{link}financials/?p={report_type}"
+        try:
+            status, data = self.http_fetcher.fetch_report(url)
+        except requests.RequestException as e:
+            with self.lock:
+                print(f"HTTP fetch failed for {ticker} ({report_type}): {str(e)}")
+            status, data = None, None
+        if status == 404:
+            # The browser would get the same missing page
+            self._note_failure(ticker, url, NOT_FOUND)
+            with self.lock:
+                print(f"{url} not found for {ticker}")
+            return None
+        with self.lock:
+            if data is None:
+                self.selenium_fallbacks += 1
+                print(f"No raw table over HTTP for {ticker} ({report_type}), falling back to Selenium")
+            else:
+                self.http_hits += 1
+        return data
+
     def process_ticker(self, link):
-        """Process a single ticker with both quarterly and annual data."""
+        """
+        Process a single ticker with both quarterly and annual data. With a
+        work journal only the reports this run has claimed are scraped.
+
+        Returns:
+            str: Why the ticker is incomplete, or None when its reports were saved
+        """
         ticker = link.split('/')[-2].upper()
-        driver = None
+        report_types = self.journal.claim(link) if self.journal is not None else list(REPORT_TYPES)
+        if not report_types:
+            return None
         try:
-            service = Service(self.chromedriver_path)
-            driver = webdriver.Chrome(service=service, options=self.chrome_options)
-            
-            # Scrape quarterly data
-            quarterly_data = self.scrape_financial_data(link, 'quarterly', driver)
-            if quarterly_data is not None:
-                self.save_data(quarterly_data, ticker, 'quarterly')
-            
-            # Scrape annual data
-            annual_data = self.scrape_financial_data(link, 'annual', driver)
-            if annual_data is not None:
-                self.save_data(annual_data, ticker, 'annual')
+            results = dict.fromkeys(report_types)
+            if self.fetch_mode == 'http':
+                for report_type in report_types:
+                    results[report_type] = self._attempt_http(link, report_type, ticker)
+
+            pending = [report_type for report_type in report_types if results[report_type] is None
+                       and self.report_failures.get((ticker, report_type)) != NOT_FOUND]
+            if pending:
+                with self.driver_pool.driver(pages=len(pending)) as driver:
+                    if self.combined_session and len(pending) == 2:
+                        results.update(self.scrape_both_periods(link, driver))
+                    # Anything the combined session missed is retried on its own page
+                    for report_type in pending:
+                        if results[report_type] is None:
+                            results[report_type] = self.scrape_financial_data(link, report_type, driver)
+
+            # Save after the browser is back in the pool
+            for report_type, data in results.items():
+                if data is not None:
+                    self.save_data(data, ticker, report_type)
+
+            missing = [report_type for report_type, data in results.items() if data is None]
+            reason = None
+            if missing:
+                reason = f"{self._negative_reason(ticker, missing)}: no {' or '.join(missing)} table"
                 
         except Exception as e:
             with self.lock:
                 print(f"Failed to process ticker {ticker}: {str(e)}")
-        finally:
-            if driver:
-                driver.quit()
+            missing = report_types
+            reason = f"{type(e).__name__}: {str(e)}"
+            if isinstance(e, TimeoutException):
+                reason = f"{TIMEOUT}: {reason}"
+
+        with self.lock:
+            for report_type in report_types:
+                self.report_failures.pop((ticker, report_type), None)
+        if len(missing) == len(REPORT_TYPES):
+            code = reason.split(':', 1)[0]
+            if code in (NOT_FOUND, NO_TABLE, TIMEOUT):
+                self.negative_cache.record(ticker, code, reason)
+        elif len(missing) < len(report_types):
+            self.negative_cache.clear([ticker])
+        if missing and self.journal is not None:
+            if is_final(reason):
+                self.journal.fail(ticker, reason, missing)
+            else:
+                self.journal.release(ticker, missing, reason)
+        return reason
+
+    def _negative_reason(self, ticker, report_types):
+        """Combine the per-report failure reasons of a ticker into one."""
+        with self.lock:
+            # Nothing recorded means the attempt broke before it saw the page
+            reasons = [self.report_failures.get((ticker, report_type), BROWSER_ERROR)
+                       for report_type in report_types]
+        return ticker_reason(reasons)
     
     def scrape_financial_data(self, link, report_type='quarterly', driver=None):
         """Scrape financial data for a specific ticker."""
@@ -167,53 +442,116 @@ class FinancialDataScraper:
                 print(f"Failed to scrape {ticker}: {str(e)}")
             return None
     
-    def _process_table_data(self, table, currency, fiscal_year):
-        """Process the scraped table and convert to DataFrame."""
-        rows = table.find_all('tr')
-        headers = []
-        for row in rows[:2]:
-            headers.append([th.text.strip() for th in row.find_all('th')])
-        
-        columns = (pd.MultiIndex.from_tuples(zip(headers[0], headers[1])) 
-                  if len(headers) == 2 else headers[0])
-        
-        data = []
-        for row in rows[2:]:
-            cols = row.find_all('td')
-            if cols:
-                data.append([col.text.strip() for col in cols])
-                
-        table_df = pd.DataFrame(data, columns=columns)
-        table_df['Currency'] = currency
-        table_df['Fiscal_Year_period'] = fiscal_year
-        return table_df
-    
     def save_data(self, df, ticker, report_type):
-        """Save the DataFrame to a file."""
-        filename = os.path.join(self.output_folder, f"{ticker}_{report_type}_financial_data.csv")
-        df.to_csv(filename, index=False)
+        """Save the DataFrame to a file, through the write-behind queue when enabled."""
+        if self.output_writer is not None:
+            self.output_writer.put((df, ticker, report_type))
+        else:
+            self._write_outputs([(df, ticker, report_type)])
+
+    def _write_outputs(self, items):
+        """
+        Write (DataFrame, ticker, report_type) items and record them in one
+        manifest and journal transaction. Files are replaced atomically, so
+        readers never see a partial write.
+        """
+        saved = []
+        saved_tables = []
+        for df, ticker, report_type in items:
+            filename = os.path.join(self.output_folder, f"{ticker}_{report_type}_financial_data.csv")
+            tmp_filename = f"{filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                df.to_csv(tmp_filename, index=False)
+                os.replace(tmp_filename, filename)
+            except OSError as e:
+                with self.lock:
+                    print(f"Failed to save {filename}: {str(e)}")
+                if self.journal is not None:
+                    self.journal.release(ticker, [report_type], f"write failed: {str(e)}")
+                continue
+            saved.append((ticker, report_type, filename))
+            saved_tables.append((df, ticker, report_type))
+            if self.refresh_planner is not None:
+                self.refresh_planner.record(ticker, report_type, df)
+        if not saved:
+            return
+        self.manifest.record_many(saved)
+        if self.dataset is not None:
+            # Buffered and written as one part per frequency at close_outputs()
+            try:
+                self.dataset.append_tables(self.market, saved_tables)
+            except Exception as e:
+                with self.lock:
+                    print(f"Failed to append {len(saved_tables)} tables to the dataset: {str(e)}")
+        if self.journal is not None:
+            self.journal.complete_many([(ticker, report_type) for ticker, report_type, _ in saved])
         with self.lock:
-            print(f"Saved data to {filename}")
+            for _, _, filename in saved:
+                print(f"Saved data to {filename}")
+
+    def close_outputs(self):
+        """Wait until every queued table has been written, then flush the dataset buffers."""
+        if self.output_writer is not None:
+            self.output_writer.close()
+            self.output_writer.print_summary()
+        if self.dataset is not None:
+            try:
+                self.dataset.flush()
+            except Exception as e:
+                print(f"Failed to write the buffered dataset tables: {str(e)}")
 
 def main():
     # Configuration
     CHROMEDRIVER_PATH = r"C:/Users/pulkit.kushwaha/Downloads/chromedriver-win64/chromedriver-win64/chromedriver.exe"
     INPUT_FILE = r"D:\Vscode\Company_revenue\Data\stock_analysis_screener_OTC_USA.csv"
     OUTPUT_FOLDER = r"D:\Vscode\Company_revenue\company_revenue_otc_usa"
-    MAX_WORKERS = 5
+    MAX_WORKERS = 5  # upper bound of the adaptive concurrency limit and the driver pool size
+    FETCH_MODE = 'http'  # 'http' tries plain HTTP first, 'selenium' always uses the browser
+    ENGINE = 'async'  # 'async' schedules every report as an asyncio task, 'adaptive' runs tickers on an AIMD-controlled thread pool
+    MAX_CONCURRENCY_PER_HOST = 20
+    REQUESTS_PER_SECOND = 5
+    CACHE_FOLDER = r"D:\Vscode\Company_revenue\html_cache"
+    REFRESH_STATE_FILE = r"D:\Vscode\Company_revenue\refresh_state_otc_usa.json"
+    BROWSER_PROFILE = 'lean'  # 'default' loads every resource, 'lean' blocks images, fonts, ads and analytics
+    JOURNAL_FILE = r"D:\Vscode\Company_revenue\work_journal_otc_usa.sqlite"
+    DATASET_FOLDER = r"D:\Vscode\Company_revenue\financials_dataset"  # None to write only the CSVs
+    MARKET = 'otc_usa'
     
     # Create output directory if it doesn't exist
     os.makedirs(OUTPUT_FOLDER, exist_ok=True)
     
     # Initialize scraper
-    scraper = FinancialDataScraper(CHROMEDRIVER_PATH, INPUT_FILE, OUTPUT_FOLDER, MAX_WORKERS)
+    scraper = FinancialDataScraper(CHROMEDRIVER_PATH, INPUT_FILE, OUTPUT_FOLDER, MAX_WORKERS,
+                                   fetch_mode=FETCH_MODE, cache_folder=CACHE_FOLDER,
+                                   refresh_state_file=REFRESH_STATE_FILE,
+                                   browser_profile=BROWSER_PROFILE, journal_file=JOURNAL_FILE,
+                                   dataset_folder=DATASET_FOLDER, market=MARKET)
     
-    # Get missing tickers
-    missing_tickers_link = scraper.get_missing_tickers()
+    # Get missing tickers and tickers whose data is stale, resuming an interrupted run
+    missing_tickers_link = scraper.journal.start_run(scraper.get_tickers_to_refresh())
     
-    # Process tickers using ThreadPoolExecutor
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        executor.map(scraper.process_ticker, missing_tickers_link)
+    try:
+        if ENGINE == 'async' and FETCH_MODE == 'http':
+            engine = AsyncScrapeEngine(scraper, MAX_CONCURRENCY_PER_HOST, REQUESTS_PER_SECOND)
+            engine.run(missing_tickers_link)
+        else:
+            # Concurrency adapts between 1 and MAX_WORKERS; failed tickers are retried, then listed
+            scheduler = AdaptiveScheduler(scraper.process_ticker, max_workers=MAX_WORKERS,
+                                          should_retry=lambda reason: not is_final(reason))
+            scheduler.run(missing_tickers_link)
+            scheduler.print_failures()
+            for link, reason in scheduler.failures.items():
+                scraper.journal.fail(link.split('/')[-2].upper(), reason)
+    finally:
+        scraper.close_outputs()
+        print(f"HTTP fetches: {scraper.http_hits}, Selenium fallbacks: {scraper.selenium_fallbacks}")
+        scraper.print_unit_summary()
+        scraper.journal.print_summary()
+        scraper.negative_cache.print_summary()
+        scraper.driver_pool.print_summary()
+        scraper.driver_pool.close()
+        if scraper.refresh_planner is not None:
+            scraper.refresh_planner.save()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
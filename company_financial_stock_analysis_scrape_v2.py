@@ -12,52 +12,41 @@ import time
 import os
 import pandas as pd
 from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, WebDriverException
 from urllib.parse import urlparse, parse_qs
+from stock_analysis_driver_pool import DriverPool
+from stock_analysis_browser_profile import configure_chrome_options
+from stock_analysis_manifest import OutputManifest
 
 
 class FinancialDataScraper:
-    def __init__(self, chromedriver_path, input_file, output_folder):
+    def __init__(self, chromedriver_path, input_file, output_folder, driver_pool=None):
         """Initialize the scraper with configuration parameters."""
         self.chromedriver_path = chromedriver_path
         self.input_file = input_file
         self.output_folder = output_folder
         self.chrome_options = self.configure_chrome_options()
+        # One long-lived browser is reused for every ticker instead of
+        # starting Chrome for each (ticker, report_type) pair
+        self.driver_pool = driver_pool or DriverPool(chromedriver_path, self.chrome_options, max_size=1)
+        self.manifest = OutputManifest(output_folder)
         
     @staticmethod
-    def configure_chrome_options():
-        """Configure Chrome WebDriver options."""
-        options = Options()
-        options.add_argument("--headless")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--window-size=1920,1080")
-        options.add_argument("--disable-dev-shm-usage")
-        return options
+    def configure_chrome_options(profile='default'):
+        """Configure Chrome WebDriver options. 'lean' blocks images, fonts, ads and analytics."""
+        return configure_chrome_options(profile)
     
     def get_missing_tickers(self):
         """Identify tickers with missing financial data."""
         df = pd.read_excel(self.input_file)
         ticker_symbols = df.drop_duplicates().dropna()['ticker'].to_list()
         
-        missing_tickers = []
-        for ticker in ticker_symbols:
-            annual_excel = os.path.join(self.output_folder, f"{ticker}_annual_financial_data.xlsx")
-            quarterly_excel = os.path.join(self.output_folder, f"{ticker}_quarterly_financial_data.xlsx")
-            
-            annual_csv = os.path.join(self.output_folder, f"{ticker}_annual_financial_data.csv")
-            quarterly_csv = os.path.join(self.output_folder, f"{ticker}_quarterly_financial_data.csv")
-    
-            # Check if both Excel and CSV files exist
-            if not ((os.path.exists(annual_excel) or os.path.exists(annual_csv)) and
-                    (os.path.exists(quarterly_excel) or os.path.exists(quarterly_csv))):
-                missing_tickers.append(ticker)
+        if self.manifest.is_empty():
+            self.manifest.rebuild()
+        missing_tickers = self.manifest.missing(ticker_symbols)
                 
         print(f"Found {len(missing_tickers)} missing tickers")
         return missing_tickers
@@ -151,19 +140,17 @@ class FinancialDataScraper:
         url1 = f"https://stockanalysis.com/stocks/{ticker}/financials/?p={report_type}"
         url2 = f"https://stockanalysis.com/quote/otc/{ticker}/financials/?p={report_type}"
         
-        driver = None
         try:
-            service = Service(self.chromedriver_path)
-            driver = webdriver.Chrome(service=service, options=self.chrome_options)
-
-            # Try first URL (regular stocks)
-            print(f"Attempting to scrape {ticker} from regular stocks URL...")
-            data = self._attempt_scrape(driver, url1, ticker)
-            
-            # If first URL fails, try OTC URL
-            if data is None:
-                print(f"Regular URL failed for {ticker}, trying OTC URL...")
-                data = self._attempt_scrape(driver, url2, ticker)
+            # Up to two page loads (stocks, then OTC) count towards the recycle limit
+            with self.driver_pool.driver(pages=2) as driver:
+                # Try first URL (regular stocks)
+                print(f"Attempting to scrape {ticker} from regular stocks URL...")
+                data = self._attempt_scrape(driver, url1, ticker)
+                
+                # If first URL fails, try OTC URL
+                if data is None:
+                    print(f"Regular URL failed for {ticker}, trying OTC URL...")
+                    data = self._attempt_scrape(driver, url2, ticker)
             
             if data is None:
                 raise ValueError(f"No financial table found for {ticker} on either URL")
@@ -173,9 +160,6 @@ class FinancialDataScraper:
         except Exception as e:
             print(f"Failed to scrape {ticker}: {str(e)}")
             raise
-        finally:
-            if driver:
-                driver.quit()
     
     def _process_table_data(self, table, currency, fiscal_year):
         """Process the scraped table and convert to DataFrame."""
@@ -204,6 +188,7 @@ class FinancialDataScraper:
         """Save the DataFrame to a file."""
         filename = os.path.join(self.output_folder, f"{ticker}_{report_type}_financial_data.csv")
         df.to_csv(filename, index=False)
+        self.manifest.record(ticker, report_type, filename)
         print(f"Saved data to {filename}")
 
 def main():
@@ -238,5 +223,8 @@ def main():
             print(f"Failed to process ticker {ticker}: {str(e)}")
             continue
 
+    scraper.driver_pool.print_summary()
+    scraper.driver_pool.close()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
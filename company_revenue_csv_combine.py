@@ -3,101 +3,89 @@
 Created on Tue Jan 14 15:47:11 2025
 
 @author: pulkit.kushwaha
+
+Only tickers with new, changed or deleted files since the last run are
+extracted again; their rows replace the old ones in the combined output.
+Delete the output file to rebuild it from every file.
 """
 
 import os
+import time
 import pandas as pd
-
-def convert_period_ending(date_str):
-    # Check if the format has the apostrophe (e.g., "Sep '24")
-    if "'" in date_str:
-        d1, d2 = date_str.split(' ', 1)
-        d3, d4 = d2.split(" ", 1)  # Start from the second part after the first space
-
-       
-        
-        date_str = d4.replace(",", "")  # Remove commas
-        # Handle month abbreviation (e.g., 'Sep' -> 'September')
-        date_str = pd.to_datetime(date_str, format='%b %d %Y').strftime('%Y-%m-%d 00:00:00')
-        return date_str
-    
-    # Convert the cleaned-up string to a datetime object
-    return pd.to_datetime(date_str, format='%B %d, %Y').strftime('%Y-%m-%d 00:00:00')
-
-
+from stock_analysis_combine import CombineState, combine_files, list_tables
+from stock_analysis_manifest import parse_output_filename
+from stock_analysis_negative_cache import NegativeCache, PAYWALLED
+from stock_analysis_values import as_integers
 
 # Folder containing financial data files
 folder_path = r"d:\Vscode\Company_revenue\company_revenue_otc_usa"
 
-# Initialize an empty list to store extracted data
-financial_data = []
-
-# Loop through all files in the folder
-for file in os.listdir(folder_path):
-    if file.endswith(".csv"):# or file.endswith(".xlsx"):  # Check if file is CSV or Excel
-        # Extract company symbol and frequency from filename
-        #file="D:/Spyder/Company_revenue_v3/TLCC_quarterly_financial_data.csv"
-        parts = file.split("_")
-        company_symbol = parts[0]
-        frequency = parts[1]  # "quarterly" or "annually"
-
-        # Read file based on its format
-        file_path = os.path.join(folder_path, file)
-        if file.endswith(".csv"):
-            df = pd.read_csv(file_path, header=None)
-        else:
-            df = pd.read_excel(file_path)
-
-        # Extract "Fiscal Year", "Period Ending", and "Revenue"
-        fiscal_years = df.iloc[0, 1:].values.tolist()  # First row contains Fiscal Years
-        period_ending = df.iloc[1, 1:].values.tolist()  # Second row contains Period Ending
-        revenue_row = df[df.iloc[:, 0] == "Revenue"]
-        currency_index = list(df.iloc[0, :]).index("Currency")
-        if currency_index:
-            if df.iloc[:,currency_index][0]=="Currency":
-                currency_row = df.iloc[:,currency_index][2]
-            else:
-                currency_row = None
-        else:
-            currency_row = None
-        fiscal_period_index = list(df.iloc[0, :]).index("Fiscal_Year_period")
-        if fiscal_period_index:
-            if df.iloc[:,fiscal_period_index][0]=="Fiscal_Year_period":
-                fiscal_period = df.iloc[:,fiscal_period_index][2]
-            else:
-                fiscal_period = None
-        else:   
-            fiscal_period = None
-
-        if not revenue_row.empty:
-            revenue_values = revenue_row.iloc[:, 1:].values.flatten().tolist()
-            
-            # Store extracted data
-            for i in range(len(fiscal_years)):  # Loop through each fiscal year column
-                financial_data.append({
-                    "Ticker": company_symbol,
-                    "Frequency": frequency,
-                    "Fiscal": fiscal_years[i],
-                    "Period Ending": period_ending[i],
-                    "Total Revenue": revenue_values[i] if i < len(revenue_values) else None,
-                    "Reported Currency": currency_row.split(" ")[-1],
-                    "Fiscal_period": fiscal_period
-                })
-
-# Convert to DataFrame for better visualization
-financial_df = pd.DataFrame(financial_data)
-
-financial_df.columns
-financial_df = financial_df[financial_df["Period Ending"].notna()]
-financial_df = financial_df[~(financial_df["Total Revenue"]=="Upgrade")]
-financial_df.loc[financial_df["Fiscal"].str.startswith("H", na=False), "Frequency"] = "Semi-Annual"
-financial_df['Period Ending'] = financial_df['Period Ending'].apply(convert_period_ending)
-
-
-
-# Save the extracted data
+# Combined output, and the files it was built from
 output_file = "Stock_analysis_extracted_financial_data_OTC_USA.csv"
-
-financial_df.to_csv(output_file, index=False)
-
-print(f"Financial data saved to {output_file}")
+state_file = "Stock_analysis_extracted_financial_data_OTC_USA.state.sqlite"
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def extract_revenue(paths):
+    # Header rows and the Revenue row of every file, extracted and made numeric in parallel
+    start = time.time()
+    financial_df = combine_files(paths, metrics=["Revenue"])
+    financial_df = financial_df.drop(columns="Metric").rename(columns={"Value": "Total Revenue"})
+    print(f"Extracted {len(financial_df)} revenue cells from {len(paths)} files in {time.time() - start:.1f}s")
+
+    # Tickers whose every revenue value is paywalled go to the scraper's negative cache
+    paywalled = financial_df["Paywalled"].groupby(financial_df["Ticker"]).all()
+    paywalled_tickers = paywalled[paywalled].index.tolist()
+    if paywalled_tickers:
+        negative_cache = NegativeCache(folder_path)
+        for ticker in paywalled_tickers:
+            negative_cache.record(ticker, PAYWALLED, "all revenue columns show Upgrade")
+        print(f"Recorded {len(paywalled_tickers)} paywalled tickers in the negative cache")
+
+    financial_df = financial_df[~financial_df["Paywalled"]].drop(columns=["Is Percent", "Paywalled"])
+    financial_df["Total Revenue"] = as_integers(financial_df["Total Revenue"])
+    financial_df.loc[financial_df["Fiscal"].str.startswith("H", na=False), "Frequency"] = "Semi-Annual"
+    # The engine parsed "Sep '24 Sep 30, 2024" and "September 30, 2024" labels and dropped undated columns
+    financial_df['Period Ending'] = financial_df.pop('Period End')
+    return financial_df
+
+
+def main():
+    state = CombineState(state_file)
+    if not os.path.exists(output_file):
+        state.clear()
+    paths = list_tables([folder_path])
+    changed, removed, state_rows = state.changes(paths)
+    tickers = {parse_output_filename(os.path.basename(path))[0] for path in changed + removed}
+    if not tickers and os.path.exists(output_file):
+        state.save(state_rows, removed)
+        print(f"{output_file} is up to date")
+        return
+
+    # Both files of a changed ticker are read again: "Semi-Annual" rows no longer show their file
+    extract_paths = [path for path in paths if parse_output_filename(os.path.basename(path))[0] in tickers]
+    # Only removed tickers: nothing to extract, their rows are just dropped
+    financial_df = extract_revenue(extract_paths) if extract_paths or not os.path.exists(output_file) else None
+    if os.path.exists(output_file):
+        previous = pd.read_csv(output_file, dtype=str, keep_default_na=False)
+        previous = previous[~previous["Ticker"].isin(tickers)]
+        if financial_df is None:
+            financial_df = previous
+        else:
+            financial_df['Period Ending'] = financial_df['Period Ending'].dt.strftime(DATE_FORMAT)
+            financial_df = pd.concat([previous, financial_df], ignore_index=True)
+        # Same order as a full run, which reads the files by name
+        financial_df = financial_df.sort_values("Ticker", key=lambda ticker: ticker + "_", kind="stable")
+        print(f"Replaced the rows of {len(tickers)} tickers, kept {len(previous)} rows")
+
+    # Save the extracted data through a rename, so the output and the state stay in step
+    tmp_file = f"{output_file}.tmp"
+    financial_df.to_csv(tmp_file, index=False, date_format=DATE_FORMAT)
+    os.replace(tmp_file, output_file)
+    state.save(state_rows, removed)
+
+    print(f"Financial data saved to {output_file}")
+
+# The extraction processes re-import this module, so the run must be guarded
+if __name__ == "__main__":
+    main()
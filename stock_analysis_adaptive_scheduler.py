@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""
+Adaptive Scheduler
+Created on Sun Oct 18 15:37:04 2026
+@author: pulkit.kushwaha
+
+Runs per-ticker scrapes with a concurrency limit that follows the site
+instead of a fixed MAX_WORKERS. The limit grows by one while latency and
+error rate stay healthy and is halved when they degrade (AIMD). Failed
+tickers are retried with jittered exponential backoff, a circuit breaker
+pauses all work when failures pile up, and tickers that still fail are
+reported with their last error instead of being dropped.
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+def backoff_delay(attempt, base=2.0, cap=120.0):
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2**attempt)]."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class AdaptiveLimiter:
+    def __init__(self, min_limit=1, max_limit=10, initial_limit=2, window=10,
+                 max_error_rate=0.2, latency_tolerance=2.0):
+        """
+        Additive-increase / multiplicative-decrease concurrency limit.
+
+        Args:
+            min_limit (int): Lowest allowed limit
+            max_limit (int): Highest allowed limit, e.g. the driver pool size
+            initial_limit (int): Limit to start from
+            window (int): Completed tasks evaluated per adjustment
+            max_error_rate (float): Error rate above which the limit is halved
+            latency_tolerance (float): Halve the limit when a window's mean
+                latency exceeds the best window seen by this factor
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = max(min_limit, min(initial_limit, max_limit))
+        self.window = window
+        self.max_error_rate = max_error_rate
+        self.latency_tolerance = latency_tolerance
+        self.baseline_latency = None
+        self.history = [self.limit]
+        self._samples = []
+        self._lock = threading.Lock()
+
+    def record(self, latency, ok):
+        """Record one completed task and adjust the limit once a window is full."""
+        with self._lock:
+            self._samples.append((latency, ok))
+            if len(self._samples) < self.window:
+                return
+            latencies = [latency for latency, ok in self._samples if ok]
+            error_rate = 1 - len(latencies) / len(self._samples)
+            mean_latency = sum(latencies) / len(latencies) if latencies else None
+            self._samples = []
+
+            slow = False
+            if mean_latency is not None:
+                if self.baseline_latency is None or mean_latency < self.baseline_latency:
+                    self.baseline_latency = mean_latency
+                slow = mean_latency > self.baseline_latency * self.latency_tolerance
+
+            if error_rate > self.max_error_rate or slow:
+                self.limit = max(self.min_limit, self.limit // 2)
+            else:
+                self.limit = min(self.max_limit, self.limit + 1)
+            self.history.append(self.limit)
+
+    def backoff(self):
+        """Drop straight to the minimum, e.g. when the circuit breaker trips."""
+        with self._lock:
+            self.limit = self.min_limit
+            self._samples = []
+            self.history.append(self.limit)
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, cooldown=60.0, max_cooldown=900.0):
+        """
+        Stop sending work after failure_threshold consecutive failures.
+
+        After cooldown seconds a single probe is let through; success closes
+        the breaker, failure reopens it with the cooldown doubled up to
+        max_cooldown.
+        """
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.state = 'closed'
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.trips = 0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """True if a task may start now."""
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open' and time.time() >= self.open_until:
+                self.state = 'half-open'
+                print("Circuit breaker half-open, sending a probe")
+                return True
+            return False
+
+    def wait_time(self):
+        """Seconds until the breaker lets a probe through, 0 when closed."""
+        with self._lock:
+            if self.state == 'open':
+                return max(0.0, self.open_until - time.time())
+            return 0.0
+
+    def record(self, ok):
+        """Record a task outcome. Returns True if this outcome tripped the breaker."""
+        with self._lock:
+            if ok:
+                self.consecutive_failures = 0
+                if self.state == 'half-open':
+                    print("Circuit breaker closed")
+                self.state = 'closed'
+                self.cooldown = self.base_cooldown
+                return False
+
+            self.consecutive_failures += 1
+            if self.state == 'half-open':
+                self.cooldown = min(self.max_cooldown, self.cooldown * 2)
+            elif self.state != 'closed' or self.consecutive_failures < self.failure_threshold:
+                return False
+            self.state = 'open'
+            self.open_until = time.time() + self.cooldown
+            self.trips += 1
+            print(f"Circuit breaker open after {self.consecutive_failures} consecutive failures, "
+                  f"pausing {self.cooldown:.0f}s")
+            return True
+
+
+class AdaptiveScheduler:
+    def __init__(self, task, max_workers=10, initial_workers=2, max_attempts=4,
+                 backoff_base=2.0, backoff_cap=120.0, limiter=None, breaker=None,
+                 should_retry=None):
+        """
+        Initialize the scheduler.
+
+        Args:
+            task (callable): Called with one item; returns None on success or
+                a failure reason string. Exceptions count as failures.
+            max_workers (int): Upper bound for the adaptive limit
+            initial_workers (int): Limit to start from
+            max_attempts (int): Attempts per item before it is reported failed
+            backoff_base (float): Base delay in seconds of the retry backoff
+            backoff_cap (float): Maximum retry delay in seconds
+            should_retry (callable): Called with a failure reason; False means
+                the failure is a definite answer (e.g. the page does not
+                exist), so it is not retried and does not count against
+                the site's health
+        """
+        self.task = task
+        self.max_workers = max_workers
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.limiter = limiter or AdaptiveLimiter(max_limit=max_workers, initial_limit=initial_workers)
+        self.breaker = breaker or CircuitBreaker()
+        self.retries = 0
+        self.should_retry = should_retry or (lambda reason: True)
+        self.failures = {}
+
+    def _timed(self, item):
+        """Run the task, returning (latency, failure reason or None)."""
+        start = time.time()
+        try:
+            reason = self.task(item)
+        except Exception as e:
+            reason = f"{type(e).__name__}: {str(e)}"
+        return time.time() - start, reason
+
+    def run(self, items):
+        """
+        Process every item. Returns the number of successful items; failures
+        are left in self.failures as item -> last reason.
+        """
+        start = time.time()
+        ready = deque((item, 0) for item in items)
+        delayed = []  # (ready time, item, attempts)
+        in_flight = {}
+        succeeded = 0
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while ready or delayed or in_flight:
+                now = time.time()
+                due = [entry for entry in delayed if entry[0] <= now]
+                delayed = [entry for entry in delayed if entry[0] > now]
+                ready.extend((item, attempts) for _, item, attempts in due)
+
+                while ready and len(in_flight) < self.limiter.limit and self.breaker.allow():
+                    item, attempts = ready.popleft()
+                    in_flight[executor.submit(self._timed, item)] = (item, attempts)
+
+                if not in_flight:
+                    # Waiting for the breaker to let a probe through or for a retry to come due
+                    pause = self.breaker.wait_time() if ready else min(entry[0] for entry in delayed) - now
+                    time.sleep(min(max(pause, 0.05), 5.0))
+                    continue
+
+                done, _ = wait(in_flight, timeout=1.0, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item, attempts = in_flight.pop(future)
+                    latency, reason = future.result()
+                    retry = reason is not None and self.should_retry(reason)
+                    self.limiter.record(latency, not retry)
+                    if self.breaker.record(not retry):
+                        self.limiter.backoff()
+                    if reason is None:
+                        succeeded += 1
+                        continue
+                    attempts += 1
+                    if retry and attempts < self.max_attempts:
+                        self.retries += 1
+                        delay = backoff_delay(attempts, self.backoff_base, self.backoff_cap)
+                        delayed.append((time.time() + delay, item, attempts))
+                        print(f"Retrying {item} in {delay:.1f}s (attempt {attempts + 1}): {reason}")
+                    else:
+                        self.failures[item] = reason
+
+        elapsed = time.time() - start
+        rate = succeeded / elapsed if elapsed else 0.0
+        print(f"Adaptive scheduler: {succeeded} succeeded, {len(self.failures)} failed, "
+              f"{self.retries} retries, {self.breaker.trips} breaker trips in {elapsed:.1f}s "
+              f"({rate:.2f}/s)")
+        print(f"Concurrency limit: now {self.limiter.limit}, max reached {max(self.limiter.history)}")
+        return succeeded
+
+    def print_failures(self):
+        for item, reason in self.failures.items():
+            print(f"  FAILED {item}: {reason}")
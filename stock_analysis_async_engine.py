@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+"""
+Asyncio Scraping Engine
+Created on Sat Oct 17 14:22:18 2026
+@author: pulkit.kushwaha
+
+Runs every (ticker, report_type) fetch over a shared aiohttp session on a
+bounded pool of worker coroutines fed from a queue. A report is claimed in
+the work journal only when a worker picks it up, so a crash leaves just
+the reports in progress leased. A per-host budget caps in-flight requests
+and the request rate, and results are handed to the writer as soon as each
+report completes. Pages that need a browser go to the scraper's driver
+pool on a small thread pool.
+
+Throttling (429), server errors (5xx) and connection errors are not sent
+to the browser: they count against the host's circuit breaker, which
+pauses new requests to that host while it is open, and the report is
+retried with jittered exponential backoff. Reports that still fail for a
+transient reason go back to pending in the work journal; only reasons
+that a retry will not change (see stock_analysis_negative_cache) fail
+them for good.
+"""
+
+import asyncio
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import aiohttp
+
+from stock_analysis_adaptive_scheduler import CircuitBreaker, backoff_delay
+from stock_analysis_http_fetch import DEFAULT_HEADERS
+from stock_analysis_parser import parse_raw_report
+from stock_analysis_negative_cache import (BROWSER_ERROR, NOT_FOUND, TIMEOUT, is_final,
+                                           reason_code, ticker_reason)
+
+REPORT_TYPES = ('quarterly', 'annual')
+# Responses that mean the host is overloaded or throttling us
+TRANSIENT_STATUSES = (429, 500, 502, 503, 504)
+
+
+class HostBudget:
+    def __init__(self, max_concurrency=10, requests_per_second=5.0, breaker=None):
+        """
+        Concurrency limit, rate limit and circuit breaker for one host.
+
+        Args:
+            max_concurrency (int): Requests allowed in flight at once
+            requests_per_second (float): Maximum request start rate, 0 for no limit
+            breaker (CircuitBreaker): Opened by consecutive transient
+                failures; requests wait while it is open
+        """
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self.breaker = breaker or CircuitBreaker()
+        self._next_start = 0.0
+        self._lock = asyncio.Lock()
+
+    def record(self, ok):
+        """Record a request outcome with the breaker."""
+        self.breaker.record(ok)
+
+    async def __aenter__(self):
+        # Wait without holding a slot while the breaker is open or a probe is out
+        while not self.breaker.allow():
+            await asyncio.sleep(max(self.breaker.wait_time(), 0.5))
+        await self.semaphore.acquire()
+        if self.interval:
+            # Reserve the next start slot, then sleep until it comes up
+            async with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start)
+                self._next_start = start + self.interval
+            await asyncio.sleep(start - now)
+        return self
+
+    async def __aexit__(self, *exc):
+        self.semaphore.release()
+
+
+class AsyncScrapeEngine:
+    def __init__(self, scraper, max_concurrency_per_host=10, requests_per_second=5.0,
+                 timeout=20, max_attempts=4, backoff_base=2.0, backoff_cap=120.0,
+                 max_in_flight=None):
+        """
+        Initialize the engine.
+
+        Args:
+            scraper (FinancialDataScraper): Supplies save_data, the driver pool
+                for Selenium fallbacks and the base_url rewrite
+            max_concurrency_per_host (int): In-flight request limit per host
+            requests_per_second (float): Request rate limit per host
+            timeout (int): Request timeout in seconds
+            max_attempts (int): Tries per report before a transient failure
+                is returned to the journal as pending
+            backoff_base (float): Base of the exponential retry backoff, seconds
+            backoff_cap (float): Longest retry backoff, seconds
+            max_in_flight (int): Reports claimed and worked on at once,
+                max_concurrency_per_host plus the browser pool size by default
+        """
+        self.scraper = scraper
+        self.max_concurrency_per_host = max_concurrency_per_host
+        self.requests_per_second = requests_per_second
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.max_in_flight = max_in_flight or max_concurrency_per_host + scraper.max_workers
+        self._budgets = {}
+        self.stats = defaultdict(int)
+
+    def _budget(self, url):
+        host = urlparse(url).netloc
+        if host not in self._budgets:
+            self._budgets[host] = HostBudget(self.max_concurrency_per_host,
+                                             self.requests_per_second)
+        return self._budgets[host]
+
+    async def _fetch(self, session, url):
+        """Fetch a page under its host's budget. Returns (status, text)."""
+        budget = self._budget(url)
+        async with budget:
+            try:
+                async with session.get(url) as response:
+                    status, text = response.status, await response.text()
+            except BaseException:
+                # Also on cancellation, so a half-open breaker never waits on a lost probe
+                budget.record(False)
+                raise
+        budget.record(status not in TRANSIENT_STATUSES)
+        return status, text
+
+    def _scrape_with_browser(self, link, report_type):
+        """Selenium fallback for one report, run on the fallback thread pool."""
+        with self.scraper.driver_pool.driver() as driver:
+            return self.scraper.scrape_financial_data(link, report_type, driver)
+
+    async def _scrape(self, session, browser_executor, link, report_type):
+        """
+        Scrape one report, retrying transient failures with backoff. Returns
+        (ticker, report_type, DataFrame or None, '<code>: <detail>' reason
+        when it failed), or None when the scraper's work journal has no
+        claimable work for it.
+        """
+        loop = asyncio.get_running_loop()
+        ticker = link.split('/')[-2].upper()
+        journal = self.scraper.journal
+        if journal is not None and not await loop.run_in_executor(None, journal.claim, link, (report_type,)):
+            return None
+        for attempt in range(self.max_attempts):
+            data, reason = await self._attempt(session, browser_executor, link, report_type, ticker)
+            if data is not None or is_final(reason) or attempt == self.max_attempts - 1:
+                break
+            self.stats["retries"] += 1
+            await asyncio.sleep(backoff_delay(attempt, self.backoff_base, self.backoff_cap))
+            if journal is not None:
+                # Renews the lease; not counted as a new attempt
+                await loop.run_in_executor(None, journal.claim, link, (report_type,))
+        return ticker, report_type, data, reason
+
+    async def _attempt(self, session, browser_executor, link, report_type, ticker):
+        """One try at a report. Returns (DataFrame or None, reason when it failed)."""
+        loop = asyncio.get_running_loop()
+        url = self.scraper.http_fetcher.resolve(f"{link}financials/?p={report_type}")
+
+        data = None
+        try:
+            status, html = await self._fetch(session, url)
+            if self.scraper.html_cache is not None:
+                await loop.run_in_executor(None, self.scraper.html_cache.store,
+                                           f"{link}financials/?p={report_type}", html, status)
+            if status == 200:
+                # Parse off the event loop so other responses keep flowing
+                data = await loop.run_in_executor(None, parse_raw_report, html)
+            self.stats[f"http_{status}"] += 1
+            if status == 404:
+                # The browser would get the same missing page
+                return None, f"{NOT_FOUND}: HTTP 404"
+            if status in TRANSIENT_STATUSES:
+                # The browser would be throttled too; back off instead
+                return None, f"{TIMEOUT}: HTTP {status}"
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.stats["http_error"] += 1
+            print(f"HTTP fetch failed for {ticker} ({report_type}): {str(e)}")
+            return None, f"{TIMEOUT}: {type(e).__name__}: {str(e)}"
+
+        reason = None
+        if data is None:
+            self.stats["selenium_fallback"] += 1
+            data = await loop.run_in_executor(browser_executor, self._scrape_with_browser,
+                                              link, report_type)
+            if data is None:
+                with self.scraper.lock:
+                    # Nothing recorded means the attempt broke before it saw the page
+                    code = self.scraper.report_failures.pop((ticker, report_type), BROWSER_ERROR)
+                reason = f"{code}: no raw table"
+        return data, reason
+
+    async def run_async(self, links):
+        """Scrape quarterly and annual reports for every link, saving as results arrive."""
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        connector = aiohttp.TCPConnector(limit=0, limit_per_host=self.max_concurrency_per_host)
+        start = time.time()
+        queue = asyncio.Queue()
+        for link in links:
+            for report_type in REPORT_TYPES:
+                queue.put_nowait((link, report_type))
+        # ticker -> negative cache reasons of its failed reports
+        failed_reports = defaultdict(list)
+
+        with ThreadPoolExecutor(max_workers=self.scraper.max_workers) as browser_executor, \
+                ThreadPoolExecutor(max_workers=1) as writer_executor:
+            async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                             headers=DEFAULT_HEADERS) as session:
+                workers = [self._worker(queue, session, browser_executor, writer_executor, failed_reports)
+                           for _ in range(min(self.max_in_flight, queue.qsize()))]
+                saved = sum(await asyncio.gather(*workers))
+
+        elapsed = time.time() - start
+        rate = saved / elapsed if elapsed else 0.0
+        trips = sum(budget.breaker.trips for budget in self._budgets.values())
+        print(f"Async engine saved {saved} reports in {elapsed:.1f}s ({rate:.2f}/s), "
+              f"circuit breaker trips: {trips}, stats: {dict(self.stats)}")
+        return saved
+
+    async def _worker(self, queue, session, browser_executor, writer_executor, failed_reports):
+        """Scrape queued reports one at a time until the queue is empty. Returns the reports saved."""
+        loop = asyncio.get_running_loop()
+        saved = 0
+        while not queue.empty():
+            link, report_type = queue.get_nowait()
+            try:
+                result = await self._scrape(session, browser_executor, link, report_type)
+            except Exception as e:
+                self.stats["failed"] += 1
+                print(f"Scrape task failed: {str(e)}")
+                continue
+            if result is None:
+                self.stats["skipped"] += 1
+                continue
+            ticker, report_type, data, reason = result
+            if data is None:
+                self.stats["failed"] += 1
+                failed_reports[ticker].append(reason)
+                await loop.run_in_executor(writer_executor, self._record_failure,
+                                           ticker, report_type, failed_reports[ticker])
+                continue
+            # Stream to the writer while the other workers continue
+            await loop.run_in_executor(writer_executor, self.scraper.save_data,
+                                       data, ticker, report_type)
+            saved += 1
+        return saved
+
+    def _record_failure(self, ticker, report_type, reasons):
+        """
+        Journal a failed report: failed for good when a retry would not
+        help, back to pending otherwise. Once every report of ticker failed,
+        add it to the negative cache, unless the browser was to blame.
+        """
+        reason = reasons[-1]
+        journal = self.scraper.journal
+        if journal is not None:
+            if is_final(reason):
+                journal.fail(ticker, reason, (report_type,))
+            else:
+                journal.release(ticker, (report_type,), reason)
+        if len(reasons) == len(REPORT_TYPES):
+            code = ticker_reason([reason_code(reason) for reason in reasons])
+            if code != BROWSER_ERROR:
+                self.scraper.negative_cache.record(ticker, code, reason)
+
+    def run(self, links):
+        return asyncio.run(self.run_async(links))
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+Browser Profiles
+Created on Sun Oct 18 14:05:18 2026
+@author: pulkit.kushwaha
+
+Chrome option profiles for the scrapers. 'default' is the original headless
+setup. 'lean' uses the eager page-load strategy and blocks images, fonts,
+media, ads and analytics, none of which the financials table needs.
+"""
+
+from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import WebDriverException
+
+PROFILES = ('default', 'lean')
+
+# URL patterns blocked in the lean profile through the DevTools protocol
+BLOCKED_URL_PATTERNS = [
+    # Resource types we never read
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*.mp4", "*.webm", "*.mp3",
+    # Third-party ads, analytics and consent hosts
+    "*googletagmanager.com*", "*google-analytics.com*", "*googlesyndication.com*",
+    "*doubleclick.net*", "*adservice.google.com*", "*amazon-adsystem.com*",
+    "*adsafeprotected.com*", "*moatads.com*", "*scorecardresearch.com*",
+    "*quantserve.com*", "*facebook.net*", "*hotjar.com*", "*cloudflareinsights.com*",
+    "*pubmatic.com*", "*rubiconproject.com*", "*criteo.com*", "*taboola.com*",
+    "*outbrain.com*", "*fundingchoicesmessages.google.com*",
+]
+
+
+def configure_chrome_options(profile='default'):
+    """Configure Chrome WebDriver options for the given profile."""
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown browser profile '{profile}', expected one of {PROFILES}")
+    options = Options()
+    options.add_argument("--headless")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument("--disable-dev-shm-usage")
+
+    if profile == 'lean':
+        # Return from driver.get at DOMContentLoaded; callers wait for the table explicitly
+        options.page_load_strategy = 'eager'
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_argument("--disable-extensions")
+        options.add_argument("--disable-background-networking")
+        options.add_argument("--disable-component-update")
+        options.add_argument("--mute-audio")
+        options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.default_content_setting_values.notifications": 2,
+        })
+    return options
+
+
+def apply_resource_blocking(driver, patterns=None):
+    """Block non-essential requests of a started driver via the DevTools protocol."""
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns or BLOCKED_URL_PATTERNS})
+    except WebDriverException as e:
+        print(f"Could not enable resource blocking: {str(e)}")
+
+
+def driver_setup_for(profile):
+    """Per-driver setup the DriverPool should run for profile, or None."""
+    return apply_resource_blocking if profile == 'lean' else None
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Browser Profile Benchmark
+Created on Sun Oct 18 14:41:52 2026
+@author: pulkit.kushwaha
+
+Loads the same financials pages with each browser profile and compares bytes
+transferred, time until the table is present and memory per driver.
+
+Usage:
+    python stock_analysis_browser_profile_benchmark.py <chromedriver_path> <fixture_folder> [url ...]
+
+Pages are served from fixture_folder by the local fixture server; the URLs
+are stockanalysis.com URLs whose saved copies are in that folder.
+"""
+
+import sys
+import time
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+from stock_analysis_browser_profile import configure_chrome_options, driver_setup_for, PROFILES
+from stock_analysis_driver_pool import DriverPool
+from stock_analysis_fixture_server import FixtureServer
+from stock_analysis_http_fetch import HttpFetcher
+
+# Bytes of the document plus every resource the page loaded
+TRANSFERRED_BYTES_JS = """
+const entries = performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'));
+return entries.reduce((total, e) => total + (e.transferSize || e.encodedBodySize || 0), 0);
+"""
+
+
+def benchmark_profile(chromedriver_path, profile, urls, timeout=20):
+    """Return (avg bytes per page, avg seconds to table, peak driver memory MB; needs psutil)."""
+    pool = DriverPool(chromedriver_path, configure_chrome_options(profile), max_size=1,
+                      driver_setup=driver_setup_for(profile))
+    total_bytes = 0
+    total_time = 0.0
+    peak_memory = 0.0
+    try:
+        with pool.driver(pages=len(urls)) as driver:
+            for url in urls:
+                start = time.time()
+                driver.get(url)
+                WebDriverWait(driver, timeout).until(EC.presence_of_element_located((By.TAG_NAME, "table")))
+                total_time += time.time() - start
+                total_bytes += driver.execute_script(TRANSFERRED_BYTES_JS) or 0
+                peak_memory = max(peak_memory, DriverPool.driver_memory_mb(driver))
+    finally:
+        pool.close()
+    return total_bytes / len(urls), total_time / len(urls), peak_memory
+
+
+def main():
+    if len(sys.argv) < 4:
+        print(__doc__)
+        return
+    chromedriver_path, fixture_folder, urls = sys.argv[1], sys.argv[2], sys.argv[3:]
+    with FixtureServer(fixture_folder) as server:
+        fetcher = HttpFetcher(base_url=server.base_url)
+        local_urls = [fetcher.resolve(url) for url in urls]
+        for profile in PROFILES:
+            avg_bytes, avg_time, memory = benchmark_profile(chromedriver_path, profile, local_urls)
+            print(f"{profile:>8}: {avg_bytes / 1024:9.1f} KB/page  {avg_time:6.2f}s to table  "
+                  f"{memory:8.1f} MB per driver")
+
+if __name__ == "__main__":
+    main()
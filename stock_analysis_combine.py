@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+"""
+Combine Engine
+Created on Sun Oct 18 21:02:15 2026
+@author: pulkit.kushwaha
+
+Extracts metric rows from every per-ticker CSV in one or more output
+folders into a single long table, one row per (ticker, frequency, period,
+metric). Each row carries the period ending label as scraped and its
+parsed Period End date; teaser columns such as "2018 - 2014" have no
+period end and are left out. Files are streamed, not parsed: only the two header rows, the
+first data row (currency and fiscal year) and the requested metric rows
+are read, and reading stops as soon as every requested metric was found,
+so ten metrics cost about the same I/O as one. Chunks of files are spread
+over a process pool and each worker returns its rows as columns, so
+nothing is built per cell. Workers also normalize the values of their
+chunk into float64 with Is Percent and Paywalled flags (see
+stock_analysis_values), so the combined table needs no string parsing.
+
+CombineState remembers (path, size, mtime, content hash) of every table of
+the last combine, so a daily re-combine only extracts new and changed
+files.
+
+Only the CSV tables are read. The .xlsx files in the older folders use the
+API layout and go through company_revenue_excel_combine.py.
+
+Usage:
+    python stock_analysis_combine.py <output_csv> <folder> [<folder> ...] [--metrics all|Revenue,Gross Profit,...]
+"""
+
+import csv
+import hashlib
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from stock_analysis_manifest import parse_output_filename
+from stock_analysis_periods import parse_period_dates
+from stock_analysis_sqlite import connect
+from stock_analysis_values import normalize_values
+
+COMBINE_COLUMNS = ['Ticker', 'Frequency', 'Fiscal', 'Period Ending', 'Period End', 'Metric', 'Value',
+                   'Is Percent', 'Paywalled', 'Reported Currency', 'Fiscal_period']
+TEXT_COLUMNS = [name for name in COMBINE_COLUMNS if name not in ('Period End', 'Is Percent', 'Paywalled')]
+ALL_METRICS = 'all'
+CURRENCY_HEADER = 'Currency'
+FISCAL_PERIOD_HEADER = 'Fiscal_Year_period'
+
+
+def read_metric_rows(path, metrics=None):
+    """
+    Stream a CSV table up to the last of the requested metric rows.
+
+    Args:
+        path (str): CSV table
+        metrics (set): Metric labels to keep, None for every metric row
+
+    Returns:
+        tuple: (fiscal header row, period ending row, first data row, list
+        of metric rows in file order), with None for header rows the file
+        does not have. Only the first row of a repeated label is kept.
+    """
+    header = period_row = first_row = None
+    metric_rows = {}
+    with open(path, newline='', encoding='utf-8') as f:
+        for i, row in enumerate(csv.reader(f)):
+            if i == 0:
+                header = row
+            elif i == 1:
+                period_row = row
+            else:
+                if i == 2:
+                    first_row = row
+                if not row or row[0] in metric_rows or (metrics is not None and row[0] not in metrics):
+                    continue
+                metric_rows[row[0]] = row
+                if metrics is not None and len(metric_rows) == len(metrics):
+                    break
+    return header, period_row, first_row, list(metric_rows.values())
+
+
+def _cell(row, index):
+    """Cell of row as read_csv would give it: None when missing or empty."""
+    if row is None or index is None or index >= len(row) or row[index] == '':
+        return None
+    return row[index]
+
+
+def extract_file(path, metrics, columns):
+    """
+    Append the values of the requested metrics of one table, one entry per
+    metric and period column, to the lists in columns. Returns the number
+    of rows added.
+    """
+    ticker, frequency = parse_output_filename(os.path.basename(path))
+    header, period_row, first_row, metric_rows = read_metric_rows(path, metrics)
+    if header is None or not metric_rows:
+        return 0
+    currency_index = header.index(CURRENCY_HEADER) if CURRENCY_HEADER in header else None
+    fiscal_index = header.index(FISCAL_PERIOD_HEADER) if FISCAL_PERIOD_HEADER in header else None
+    currency = _cell(first_row, currency_index)
+    fiscal_period = _cell(first_row, fiscal_index)
+
+    periods = [i for i in range(1, len(header)) if i not in (currency_index, fiscal_index)]
+    fiscal = [header[i] for i in periods]
+    period_ending = [_cell(period_row, i) for i in periods]
+    n = len(periods) * len(metric_rows)
+    columns['Ticker'].extend([ticker] * n)
+    columns['Frequency'].extend([frequency] * n)
+    columns['Reported Currency'].extend([currency.split(' ')[-1] if currency else None] * n)
+    columns['Fiscal_period'].extend([fiscal_period] * n)
+    for row in metric_rows:
+        columns['Fiscal'].extend(fiscal)
+        columns['Period Ending'].extend(period_ending)
+        columns['Metric'].extend([row[0]] * len(periods))
+        columns['Value'].extend(_cell(row, i) for i in periods)
+    return n
+
+
+def _extract_chunk(paths, metrics):
+    """
+    Worker: extract a chunk of files, parse its period endings and
+    normalize its values. Rows without a period end date are dropped.
+
+    Returns:
+        dict: column name -> array of values for every dated row of the chunk
+    """
+    columns = {name: [] for name in TEXT_COLUMNS}
+    for path in paths:
+        try:
+            extract_file(path, metrics, columns)
+        except Exception as e:
+            print(f"Skipping {path}: {str(e)}")
+    period_end = parse_period_dates(columns['Period Ending'])
+    dated = period_end.notna().values
+    values = normalize_values(columns['Value'])
+    columns = {name: np.asarray(column, dtype=object)[dated] for name, column in columns.items()}
+    columns['Period End'] = period_end.values[dated]
+    columns['Value'] = values['value'].values[dated]
+    columns['Is Percent'] = values['is_percent'].values[dated]
+    columns['Paywalled'] = values['paywalled'].values[dated]
+    return columns
+
+
+def list_tables(folders):
+    """Every per-ticker CSV table in folders, in folder and name order."""
+    return [os.path.join(folder, name)
+            for folder in folders
+            for name in sorted(os.listdir(folder))
+            if name.endswith('.csv') and parse_output_filename(name) is not None]
+
+
+def combine(folders, metrics=('Revenue',), max_workers=None, chunk_size=100):
+    """Extract metrics from every table in folders; see combine_files."""
+    return combine_files(list_tables(folders), metrics, max_workers, chunk_size)
+
+
+def combine_files(paths, metrics=('Revenue',), max_workers=None, chunk_size=100):
+    """
+    Extract metrics from the given tables in one pass per file.
+
+    Args:
+        paths (list): {ticker}_{frequency}_financial_data.csv files
+        metrics (list): Labels of the metric rows, exactly as in the first
+            column, or "all" for every metric row
+        max_workers (int): Extraction processes, all cores by default; 1,
+            or a single chunk of files, extracts in this process
+        chunk_size (int): Files handed to a worker at once
+
+    Returns:
+        DataFrame: COMBINE_COLUMNS, one row per (file, metric, dated period
+        column). Period End is datetime64; Value is float64, NA for
+        placeholders and paywalled cells.
+    """
+    if isinstance(metrics, str):
+        metrics = None if metrics == ALL_METRICS else [metrics]
+    wanted = None if metrics is None else frozenset(metrics)
+    chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+    if max_workers == 1 or len(chunks) < 2:
+        results = [_extract_chunk(chunk, wanted) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(_extract_chunk, chunks, [wanted] * len(chunks)))
+    frames = [pd.DataFrame(columns)[COMBINE_COLUMNS] for columns in results]
+    if not frames:
+        return empty_combined()
+    return pd.concat(frames, ignore_index=True)
+
+
+def empty_combined():
+    """Combined table without rows, with the column types of a non-empty one."""
+    columns = {name: pd.Series(dtype=object) for name in TEXT_COLUMNS}
+    columns['Period End'] = pd.Series(dtype='datetime64[ns]')
+    columns['Value'] = pd.Series(dtype='float64')
+    columns['Is Percent'] = pd.Series(dtype=bool)
+    columns['Paywalled'] = pd.Series(dtype=bool)
+    return pd.DataFrame(columns)[COMBINE_COLUMNS]
+
+
+def file_hash(path):
+    """SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class CombineState:
+    def __init__(self, state_file):
+        """
+        Open (creating if needed) the state of an incremental combine.
+
+        Args:
+            state_file (str): SQLite file, kept next to the combined output
+        """
+        self.state_file = state_file
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS tables (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime REAL NOT NULL,
+                    hash TEXT NOT NULL
+                )""")
+
+    def _connect(self):
+        return connect(self.state_file)
+
+    def is_empty(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM tables").fetchone()[0] == 0
+
+    def clear(self):
+        """Forget every table, so the next combine extracts everything."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM tables")
+
+    def changes(self, paths):
+        """
+        Compare tables with the last combine. Files whose size and mtime are
+        unchanged are not read; the others are hashed, so a rewrite with
+        identical content only refreshes the stored stat.
+
+        Returns:
+            tuple: (new or changed paths, paths that no longer exist, rows
+            to pass to save() once the combined output is written)
+        """
+        with self._connect() as conn:
+            known = {path: (size, mtime, digest) for path, size, mtime, digest
+                     in conn.execute("SELECT path, size, mtime, hash FROM tables")}
+        changed, rows = [], []
+        for path in paths:
+            stat = os.stat(path)
+            previous = known.get(path)
+            if previous is not None and previous[:2] == (stat.st_size, stat.st_mtime):
+                continue
+            digest = file_hash(path)
+            if previous is None or previous[2] != digest:
+                changed.append(path)
+            rows.append((path, stat.st_size, stat.st_mtime, digest))
+        removed = sorted(set(known) - set(paths))
+        return changed, removed, rows
+
+    def save(self, rows, removed):
+        """Record the tables of a combined output that was written successfully."""
+        with self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO tables VALUES (?, ?, ?, ?)", rows)
+            conn.executemany("DELETE FROM tables WHERE path = ?", [(path,) for path in removed])
+
+
+def main():
+    args = sys.argv[1:]
+    metrics = ['Revenue']
+    if '--metrics' in args:
+        i = args.index('--metrics')
+        value = args[i + 1] if i + 1 < len(args) else ''
+        metrics = ALL_METRICS if value == ALL_METRICS else [m.strip() for m in value.split(',') if m.strip()]
+        del args[i:i + 2]
+    if len(args) < 2 or not metrics:
+        print(__doc__)
+        return
+    output_file, folders = args[0], args[1:]
+    start = time.time()
+    df = combine(folders, metrics)
+    elapsed = time.time() - start
+    df.to_csv(output_file, index=False)
+    files = len(list_tables(folders))
+    print(f"Combined {files} files into {len(df)} rows in {elapsed:.1f}s "
+          f"({files / elapsed if elapsed else 0.0:.0f} files/s); saved to {output_file}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+Combine Benchmark
+Created on Sun Oct 18 21:19:40 2026
+@author: pulkit.kushwaha
+
+Files per second of the combine engine at increasing worker counts, next to
+the original loop that parses every CSV completely with read_csv and
+builds one dict per cell. Also checks that the engine returns the same
+rows as the original loop, and times extracting ten metrics and every
+metric in the same single pass per file. Finally compares the original
+row-by-row period ending conversion with the vectorized, memoized parser.
+
+Usage:
+    python stock_analysis_combine_benchmark.py <folder> [<folder> ...]
+"""
+
+import os
+import sys
+import time
+
+import pandas as pd
+
+from stock_analysis_combine import ALL_METRICS, COMBINE_COLUMNS, combine, list_tables
+from stock_analysis_periods import _period_date_cache, parse_period_dates
+from stock_analysis_values import normalize_values
+
+TEN_METRICS = ['Revenue', 'Revenue Growth (YoY)', 'Cost of Revenue', 'Gross Profit',
+               'Operating Income', 'Pretax Income', 'Net Income', 'EPS (Basic)',
+               'EPS (Diluted)', 'Free Cash Flow']
+
+
+def legacy_combine(folders, metric='Revenue'):
+    """The original single-process combine loop."""
+    financial_data = []
+    for path in list_tables(folders):
+        parts = os.path.basename(path).split("_")
+        df = pd.read_csv(path, header=None)
+        fiscal_years = df.iloc[0, 1:].values.tolist()
+        period_ending = df.iloc[1, 1:].values.tolist()
+        metric_row = df[df.iloc[:, 0] == metric]
+        header = list(df.iloc[0, :])
+        currency = df.iloc[2, header.index("Currency")] if "Currency" in header else None
+        fiscal_period = df.iloc[2, header.index("Fiscal_Year_period")] if "Fiscal_Year_period" in header else None
+        if not metric_row.empty:
+            values = metric_row.iloc[:, 1:].values.flatten().tolist()
+            for i in range(len(fiscal_years)):
+                financial_data.append({
+                    "Ticker": parts[0],
+                    "Frequency": parts[1],
+                    "Fiscal": fiscal_years[i],
+                    "Period Ending": period_ending[i],
+                    "Metric": metric,
+                    "Value": values[i] if i < len(values) else None,
+                    "Reported Currency": currency.split(" ")[-1] if isinstance(currency, str) else None,
+                    "Fiscal_period": fiscal_period,
+                })
+    df = pd.DataFrame(financial_data, columns=[c for c in COMBINE_COLUMNS
+                                              if c not in ('Period End', 'Is Percent', 'Paywalled')])
+    # The engine returns parsed period ends and normalized values and drops
+    # undated columns; the original loop kept the text
+    df['Period End'] = parse_period_dates(df['Period Ending'])
+    df = df[df['Period End'].notna()].reset_index(drop=True)
+    values = normalize_values(df['Value'])
+    df['Value'] = values['value']
+    df['Is Percent'] = values['is_percent']
+    df['Paywalled'] = values['paywalled']
+    return df[COMBINE_COLUMNS]
+
+
+def convert_period_ending(date_str):
+    """The original per-row period ending conversion."""
+    if "'" in date_str:
+        d1, d2 = date_str.split(' ', 1)
+        d3, d4 = d2.split(" ", 1)
+        date_str = d4.replace(",", "")
+        return pd.to_datetime(date_str, format='%b %d %Y').strftime('%Y-%m-%d 00:00:00')
+    return pd.to_datetime(date_str, format='%B %d, %Y').strftime('%Y-%m-%d 00:00:00')
+
+
+def benchmark_period_parsing(labels):
+    """Time the apply path against parse_period_dates with a cold and a warm cache."""
+    start = time.perf_counter()
+    reference = labels.apply(convert_period_ending)
+    elapsed = time.perf_counter() - start
+    print(f"{'apply':<16} {elapsed:7.3f}s {len(labels) / elapsed:10.0f} labels/s")
+    for label in ('vectorized cold', 'vectorized warm'):
+        if label.endswith('cold'):
+            _period_date_cache.clear()
+        start = time.perf_counter()
+        parsed = parse_period_dates(labels)
+        elapsed = time.perf_counter() - start
+        same = parsed.dt.strftime('%Y-%m-%d 00:00:00').equals(reference)
+        print(f"{label:<16} {elapsed:7.3f}s {len(labels) / elapsed:10.0f} labels/s"
+              f"{'' if same else '  (dates differ from the apply path)'}")
+
+
+def _comparable(df):
+    """Rows with a period ending, as text, in a stable order."""
+    df = df[df['Period Ending'].notna()].astype(str)
+    return df.sort_values(COMBINE_COLUMNS).reset_index(drop=True)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return
+    folders = sys.argv[1:]
+    files = len(list_tables(folders))
+    cores = os.cpu_count() or 1
+    print(f"{files} tables in {len(folders)} folders, {cores} cores")
+
+    start = time.perf_counter()
+    reference = legacy_combine(folders)
+    elapsed = time.perf_counter() - start
+    print(f"{'original loop':<16} {elapsed:7.2f}s {files / elapsed:8.0f} files/s")
+
+    worker_counts = sorted(n for n in {1, 2, 4, cores} if n <= cores)
+    for workers in worker_counts:
+        start = time.perf_counter()
+        df = combine(folders, max_workers=workers)
+        elapsed = time.perf_counter() - start
+        same = _comparable(df).equals(_comparable(reference))
+        print(f"{f'engine x{workers}':<16} {elapsed:7.2f}s {files / elapsed:8.0f} files/s"
+              f"{'' if same else '  (rows differ from the original loop)'}")
+
+    workers = worker_counts[-1]
+    for label, metrics in (('ten metrics', TEN_METRICS), ('all metrics', ALL_METRICS)):
+        start = time.perf_counter()
+        df = combine(folders, metrics, max_workers=workers)
+        elapsed = time.perf_counter() - start
+        print(f"{f'{label} x{workers}':<16} {elapsed:7.2f}s {files / elapsed:8.0f} files/s "
+              f"({len(df)} rows, {df['Metric'].nunique()} metrics)")
+
+    # Period endings of the revenue values the combine script keeps
+    labels = reference.loc[reference['Period Ending'].notna() & ~reference['Paywalled'],
+                           'Period Ending']
+    labels = labels[parse_period_dates(labels).notna()].reset_index(drop=True)
+    print(f"{len(labels)} period endings, {labels.nunique()} distinct")
+    benchmark_period_parsing(labels)
+
+if __name__ == "__main__":
+    main()
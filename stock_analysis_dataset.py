@@ -0,0 +1,398 @@
+# -*- coding: utf-8 -*-
+"""
+Columnar Financials Dataset
+Created on Sun Oct 18 20:11:38 2026
+@author: pulkit.kushwaha
+
+One Parquet dataset for every scraped table instead of two wide CSVs per
+ticker. Values are stored in long format, one row per (ticker, metric,
+period), with typed numerics:
+
+    ticker, metric, period, period_end, value, is_percent, paywalled, scraped_at
+
+The rows are partitioned by market and frequency:
+<root>/data/market=<m>/frequency=<f>/part-*.parquet. Currency and fiscal
+year are stored once per ticker and frequency in <root>/metadata/.
+The scraper buffers the tables it saves and appends them as one part per
+partition when a buffer fills up or at flush(), instead of one tiny part
+per writer batch. Re-scraped tickers are appended as new parts; loaders keep the latest
+scrape of each (ticker, frequency), and compact() rewrites every partition
+as a single deduplicated file. migrate skips the older .xlsx files in the
+API layout (company_revenue_excel_combine.py reads those) and any file
+that gives no dated rows, and reports them.
+
+Needs pyarrow.
+
+Usage:
+    python stock_analysis_dataset.py migrate <dataset_root> <market>=<folder> [<market>=<folder> ...]
+    python stock_analysis_dataset.py load <dataset_root>
+    python stock_analysis_dataset.py compact <dataset_root>
+"""
+
+import os
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # the dataset is unavailable without pyarrow
+    pa = ds = pq = None
+
+from stock_analysis_manifest import parse_output_filename
+from stock_analysis_periods import parse_period_dates
+from stock_analysis_values import normalize_values
+
+DATA_COLUMNS = ['ticker', 'metric', 'period', 'period_end', 'value', 'is_percent', 'paywalled', 'scraped_at']
+# Market and frequency come from the partition path
+METADATA_COLUMNS = ['ticker', 'currency', 'fiscal_year_period', 'scraped_at']
+META_HEADERS = ('Currency', 'Fiscal_Year_period')
+CELL_COLUMNS = ['ticker', 'metric', 'period', 'period_label', 'text', 'scraped_at']
+# First header cell of the older .xlsx files in the API layout, one row per period
+API_LAYOUT_HEADER = 'fiscalDateEnding'
+
+# Fixed file schemas, so parts written at different times always merge
+if pa is not None:
+    DATA_SCHEMA = pa.schema([
+        ('ticker', pa.string()), ('metric', pa.string()), ('period', pa.string()),
+        ('period_end', pa.timestamp('s')), ('value', pa.float64()), ('is_percent', pa.bool_()),
+        ('paywalled', pa.bool_()), ('scraped_at', pa.timestamp('s')),
+    ])
+    METADATA_SCHEMA = pa.schema([
+        ('ticker', pa.string()), ('currency', pa.string()), ('fiscal_year_period', pa.string()),
+        ('scraped_at', pa.timestamp('s')),
+    ])
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("The columnar dataset needs pyarrow (pip install pyarrow)")
+
+
+def table_to_grid(df):
+    """
+    Cell grid of a scraped table as written to CSV: the header rows
+    (fiscal period, period ending) followed by the metric rows.
+    """
+    if isinstance(df.columns, pd.MultiIndex):
+        header = [list(level) for level in zip(*df.columns)]
+    else:
+        header = [list(df.columns)]
+    return pd.DataFrame(header + df.astype(object).values.tolist())
+
+
+def read_grid(path):
+    """Cell grid of a saved CSV or Excel table, every cell as text."""
+    if path.endswith('.csv'):
+        return pd.read_csv(path, header=None, dtype=str, keep_default_na=False)
+    return pd.read_excel(path, header=None, dtype=str).fillna('')
+
+
+def grid_to_cells(grid, ticker, frequency, scraped_at):
+    """
+    Untyped long rows and the metadata row of one table grid. Only array
+    reshaping happens here; type_cells converts many tables at once.
+
+    Returns:
+        tuple: (DataFrame of ticker, metric, period, period_label, text,
+        scraped_at; metadata dict)
+    """
+    cells = grid.to_numpy(dtype=object)
+    header = [str(name) for name in cells[0]] if len(cells) else []
+    meta = {'ticker': ticker, 'frequency': frequency, 'currency': None,
+            'fiscal_year_period': None, 'scraped_at': scraped_at}
+    if len(cells) > 2:
+        for name, key in zip(META_HEADERS, ('currency', 'fiscal_year_period')):
+            if name in header:
+                value = cells[2, header.index(name)]
+                meta[key] = value.split(' ')[-1] if key == 'currency' and value else value
+
+    period_columns = [i for i in range(1, len(header)) if header[i] not in META_HEADERS]
+    if len(cells) < 3 or not period_columns:
+        return pd.DataFrame(columns=CELL_COLUMNS), meta
+
+    body = cells[2:, period_columns]  # metrics x periods
+    n_metrics, n_periods = body.shape
+    long = pd.DataFrame({
+        'ticker': ticker,
+        'metric': np.repeat(cells[2:, 0], n_periods),
+        'period': np.tile(np.array(header, dtype=object)[period_columns], n_metrics),
+        'period_label': np.tile(cells[1, period_columns], n_metrics),
+        'text': body.ravel(),
+        'scraped_at': scraped_at,
+    })
+    return long, meta
+
+
+def type_cells(cells):
+    """
+    Typed long rows (DATA_COLUMNS) from grid_to_cells output, converted a
+    whole column at a time. Teaser columns such as "+20 Quarters" have no
+    period end and are dropped.
+    """
+    period_end = parse_period_dates(cells['period_label'])
+    cells = cells[period_end.notna().values]
+    values = normalize_values(cells['text'])
+    return pd.DataFrame({
+        'ticker': cells['ticker'].values,
+        'metric': cells['metric'].astype(str).values,
+        'period': cells['period'].values,
+        'period_end': period_end[period_end.notna()].values,
+        'value': values['value'].values,
+        'is_percent': values['is_percent'].values,
+        'paywalled': values['paywalled'].values,
+        'scraped_at': pd.to_datetime(cells['scraped_at'].values, unit='s').floor('s'),
+    })
+
+
+def _convert_files(jobs):
+    """
+    Worker for migrate: convert a chunk of (market, path) jobs. Files that
+    give no typed rows are left out, metadata included.
+
+    Returns:
+        tuple: ((market, frequency, typed long rows, metadata rows) per
+        partition, (path, reason) of every skipped file)
+    """
+    partitions = {}
+    skipped = []
+    for market, path in jobs:
+        ticker, frequency = parse_output_filename(os.path.basename(path))
+        try:
+            grid = read_grid(path)
+            if len(grid) and str(grid.iat[0, 0]).strip() == API_LAYOUT_HEADER:
+                skipped.append((path, 'API layout'))
+                continue
+            cells, meta = grid_to_cells(grid, ticker, frequency, os.path.getmtime(path))
+        except Exception as e:
+            print(f"Skipping {path}: {str(e)}")
+            skipped.append((path, 'unreadable'))
+            continue
+        if not len(cells):
+            skipped.append((path, 'no table'))
+            continue
+        frames, metas = partitions.setdefault((market, frequency), ([], []))
+        frames.append(cells)
+        metas.append((meta, path))
+
+    results = []
+    for (market, frequency), (frames, metas) in partitions.items():
+        long = type_cells(pd.concat(frames, ignore_index=True))
+        converted = set(long['ticker'])
+        for meta, path in metas:
+            if meta['ticker'] not in converted:
+                skipped.append((path, 'no dated period columns'))
+        results.append((market, frequency, long,
+                        [meta for meta, _ in metas if meta['ticker'] in converted]))
+    return results, skipped
+
+
+class FinancialDataset:
+    def __init__(self, root, buffer_rows=500000):
+        """
+        Open (creating if needed) the dataset under root.
+
+        Args:
+            root (str): Dataset folder
+            buffer_rows (int): Rows append_tables buffers per market and
+                frequency before writing them as one part
+        """
+        _require_pyarrow()
+        self.root = root
+        self.data_root = os.path.join(root, 'data')
+        self.metadata_root = os.path.join(root, 'metadata')
+        self.buffer_rows = buffer_rows
+        # (market, frequency) -> (typed long frames, metadata rows) not written yet
+        self._buffers = {}
+        self._lock = threading.Lock()
+
+    def _write_part(self, folder, df, schema):
+        """Write df as a new part file under folder via an atomic rename."""
+        os.makedirs(folder, exist_ok=True)
+        name = f"part-{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}.parquet"
+        path = os.path.join(folder, name)
+        tmp_path = f"{path}.tmp"
+        table = pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+        pq.write_table(table, tmp_path, compression='zstd')
+        os.replace(tmp_path, path)
+        return path
+
+    def write(self, market, frequency, long, metadata):
+        """Append long rows and metadata rows of one market and frequency as new parts."""
+        if len(long):
+            self._write_part(os.path.join(self.data_root, f"market={market}", f"frequency={frequency}"),
+                             long[DATA_COLUMNS], DATA_SCHEMA)
+        if len(metadata):
+            metadata = pd.DataFrame(metadata)[METADATA_COLUMNS]
+            metadata['scraped_at'] = pd.to_datetime(metadata['scraped_at'], unit='s').dt.floor('s')
+            self._write_part(os.path.join(self.metadata_root, f"market={market}", f"frequency={frequency}"),
+                             metadata, METADATA_SCHEMA)
+
+    def append_tables(self, market, tables, scraped_at=None):
+        """
+        Buffer freshly scraped tables, given as (DataFrame, ticker, frequency)
+        with the layout process_table_data returns. A partition is written
+        once it holds buffer_rows rows; call flush() at the end of the run.
+        """
+        scraped_at = scraped_at or time.time()
+        by_frequency = {}
+        for df, ticker, frequency in tables:
+            cells, meta = grid_to_cells(table_to_grid(df), ticker, frequency, scraped_at)
+            frames, metas = by_frequency.setdefault(frequency, ([], []))
+            frames.append(cells)
+            metas.append(meta)
+        with self._lock:
+            for frequency, (frames, metas) in by_frequency.items():
+                long = type_cells(pd.concat(frames, ignore_index=True))
+                buffered, buffered_metas = self._buffers.setdefault((market, frequency), ([], []))
+                buffered.append(long)
+                buffered_metas.extend(meta for meta in metas if meta['ticker'] in set(long['ticker']))
+                if sum(len(frame) for frame in buffered) >= self.buffer_rows:
+                    self._flush_partition(market, frequency)
+
+    def _flush_partition(self, market, frequency):
+        """Write the buffered tables of one partition as one part. Caller holds the lock."""
+        frames, metas = self._buffers.pop((market, frequency), ([], []))
+        if frames:
+            self.write(market, frequency, pd.concat(frames, ignore_index=True), metas)
+
+    def flush(self):
+        """Write every buffered table; returns the number of partitions written."""
+        with self._lock:
+            partitions = list(self._buffers)
+            for market, frequency in partitions:
+                self._flush_partition(market, frequency)
+        return len(partitions)
+
+    def _read(self, root, columns=None, market=None, frequency=None, filters=None):
+        if not os.path.isdir(root):
+            return None
+        dataset = ds.dataset(root, format='parquet', partitioning='hive')
+        expression = None
+        for name, value in (('market', market), ('frequency', frequency)):
+            if value is not None:
+                condition = ds.field(name) == value
+                expression = condition if expression is None else expression & condition
+        if filters is not None:
+            expression = filters if expression is None else expression & filters
+        # Repeated strings (ticker, metric, period) load as categoricals
+        return dataset.to_table(columns=columns, filter=expression).to_pandas(strings_to_categorical=True)
+
+    def load(self, market=None, frequency=None, metrics=None, columns=None, latest_only=True):
+        """
+        Load long rows, optionally for one market, frequency and list of
+        metrics. latest_only keeps only the newest scrape of each ticker.
+        """
+        filters = ds.field('metric').isin(list(metrics)) if metrics is not None else None
+        if columns is not None and latest_only:
+            columns = list(dict.fromkeys(list(columns) + ['market', 'ticker', 'frequency', 'scraped_at']))
+        df = self._read(self.data_root, columns, market, frequency, filters)
+        if df is None:
+            return pd.DataFrame(columns=DATA_COLUMNS)
+        if latest_only and len(df):
+            latest = df.groupby(['market', 'ticker', 'frequency'], observed=True)['scraped_at'].transform('max')
+            df = df[df['scraped_at'] == latest]
+        return df.reset_index(drop=True)
+
+    def load_metadata(self, market=None, frequency=None):
+        """Currency and fiscal year per ticker and frequency, newest scrape only."""
+        df = self._read(self.metadata_root, market=market, frequency=frequency)
+        if df is None:
+            return pd.DataFrame(columns=METADATA_COLUMNS)
+        return (df.sort_values('scraped_at')
+                  .drop_duplicates(['market', 'frequency', 'ticker'], keep='last')
+                  .reset_index(drop=True))
+
+    def compact(self):
+        """Rewrite every partition as one file holding only the newest scrape of each ticker."""
+        for root, loader in ((self.data_root, self.load), (self.metadata_root, self.load_metadata)):
+            if not os.path.isdir(root):
+                continue
+            for market_dir in sorted(os.listdir(root)):
+                for frequency_dir in sorted(os.listdir(os.path.join(root, market_dir))):
+                    folder = os.path.join(root, market_dir, frequency_dir)
+                    old_parts = [os.path.join(folder, name) for name in os.listdir(folder)
+                                 if name.endswith('.parquet')]
+                    if len(old_parts) < 2:
+                        continue
+                    market = market_dir.split('=', 1)[1]
+                    frequency = frequency_dir.split('=', 1)[1]
+                    df = loader(market=market, frequency=frequency)
+                    if root == self.data_root:
+                        self._write_part(folder, df[DATA_COLUMNS], DATA_SCHEMA)
+                    else:
+                        self._write_part(folder, df[METADATA_COLUMNS], METADATA_SCHEMA)
+                    for path in old_parts:
+                        os.remove(path)
+                    print(f"Compacted {len(old_parts)} parts in {folder}")
+
+
+def migrate(dataset_root, sources, max_workers=None, chunk_size=200):
+    """
+    Convert per-ticker CSV/Excel folders into the dataset.
+
+    Args:
+        dataset_root (str): Dataset folder
+        sources (dict): market -> folder of {ticker}_{frequency}_financial_data files
+        max_workers (int): Conversion processes, all cores by default
+        chunk_size (int): Files converted together, so typing runs on big columns
+    """
+    dataset = FinancialDataset(dataset_root)
+    jobs = [(market, os.path.join(folder, name))
+            for market, folder in sources.items()
+            for name in sorted(os.listdir(folder))
+            if parse_output_filename(name) is not None]
+    chunks = [jobs[i:i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+    start = time.time()
+    partitions = {}
+    skipped = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for results, chunk_skipped in executor.map(_convert_files, chunks):
+            for market, frequency, long, metas in results:
+                frames, all_metas = partitions.setdefault((market, frequency), ([], []))
+                frames.append(long)
+                all_metas.extend(metas)
+            for path, reason in chunk_skipped:
+                skipped[reason] = skipped.get(reason, 0) + 1
+    rows = converted = 0
+    for (market, frequency), (frames, metas) in partitions.items():
+        long = pd.concat(frames, ignore_index=True)
+        dataset.write(market, frequency, long, metas)
+        rows += len(long)
+        converted += len(metas)
+    print(f"Migrated {converted} of {len(jobs)} files into {rows} rows "
+          f"in {time.time() - start:.1f}s")
+    if skipped:
+        print("Skipped " + ", ".join(f"{count} files ({reason})" for reason, count in sorted(skipped.items())))
+    if 'API layout' in skipped:
+        print("Files in the API layout go through company_revenue_excel_combine.py")
+    return converted
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1] not in ("migrate", "load", "compact"):
+        print(__doc__)
+        return
+    command, dataset_root = sys.argv[1], sys.argv[2]
+    if command == "migrate":
+        sources = dict(arg.split('=', 1) for arg in sys.argv[3:])
+        migrate(dataset_root, sources)
+    elif command == "compact":
+        FinancialDataset(dataset_root).compact()
+    else:
+        start = time.time()
+        df = FinancialDataset(dataset_root).load()
+        elapsed = time.time() - start
+        memory = df.memory_usage(deep=True).sum() / 1024 ** 2
+        print(f"Loaded {len(df)} rows of {df['ticker'].nunique()} tickers in {elapsed:.2f}s "
+              f"({memory:.1f} MB in memory)")
+
+if __name__ == "__main__":
+    main()
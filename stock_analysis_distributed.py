@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+Distributed Scraping
+Created on Sun Oct 18 18:02:47 2026
+@author: pulkit.kushwaha
+
+Runs the financials scraper as any number of worker processes sharing one
+work journal and one output folder, on a single host or on several hosts
+that mount the same filesystem. Workers claim leased batches of tickers
+from the journal, so no two workers scrape the same ticker, and every
+output file is written through an atomic rename. The coordinator seeds
+the journal, optionally starts local workers and reports the aggregate
+and per-worker throughput.
+
+Usage:
+    python stock_analysis_distributed.py coordinator --input IN.csv --output OUT_DIR --journal J.sqlite [--workers 4]
+    python stock_analysis_distributed.py worker --input IN.csv --output OUT_DIR --journal J.sqlite
+
+Local test against saved pages (no live site):
+    python stock_analysis_distributed.py coordinator ... --workers 4 --fixtures FIXTURE_DIR
+
+Use --no-wal when the journal is on a network filesystem.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+from company_financial_stock_analysis_scrape_USA_v2 import FinancialDataScraper
+from stock_analysis_adaptive_scheduler import AdaptiveScheduler
+from stock_analysis_fixture_server import FixtureServer
+from stock_analysis_negative_cache import is_final
+from stock_analysis_work_journal import WorkJournal
+
+# Options passed through from the coordinator to the workers it starts
+WORKER_OPTIONS = ('input', 'output', 'journal', 'chromedriver', 'fetch_mode', 'profile',
+                  'cache', 'threads', 'batch_size', 'poll_interval')
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Sharded financials scraping over a shared work journal")
+    parser.add_argument("role", choices=("coordinator", "worker"))
+    parser.add_argument("--input", required=True, help="Screener CSV with Symbol and Link columns")
+    parser.add_argument("--output", required=True, help="Shared output folder")
+    parser.add_argument("--journal", required=True, help="Shared work journal (SQLite)")
+    parser.add_argument("--chromedriver", default="chromedriver", help="Path to chromedriver")
+    parser.add_argument("--fetch-mode", default="http", choices=("http", "selenium"))
+    parser.add_argument("--profile", default="lean", choices=("default", "lean"))
+    parser.add_argument("--cache", default=None, help="HTML cache folder")
+    parser.add_argument("--base-url", default=None, help="Replace the host of every URL")
+    parser.add_argument("--threads", type=int, default=5, help="Maximum concurrent tickers per worker")
+    parser.add_argument("--batch-size", type=int, default=20, help="Tickers claimed per batch")
+    parser.add_argument("--poll-interval", type=float, default=5.0,
+                        help="Seconds between journal checks while waiting for leased work")
+    parser.add_argument("--workers", type=int, default=0, help="Local workers started by the coordinator")
+    parser.add_argument("--fixtures", default=None,
+                        help="Serve this fixture folder locally and point the workers at it")
+    parser.add_argument("--refresh-state", default=None,
+                        help="Refresh planner state; the coordinator updates it when the run ends")
+    parser.add_argument("--no-wal", action="store_true", help="Use a rollback journal instead of WAL")
+    return parser
+
+
+def run_worker(args):
+    """Claim batches from the journal until no work is left. Returns the reports saved."""
+    os.makedirs(args.output, exist_ok=True)
+    journal = WorkJournal(args.journal)
+    scraper = FinancialDataScraper(args.chromedriver, args.input, args.output, args.threads,
+                                   fetch_mode=args.fetch_mode, base_url=args.base_url,
+                                   cache_folder=args.cache, browser_profile=args.profile,
+                                   journal_file=args.journal)
+    # One scheduler for every batch, so the concurrency limit carries over
+    scheduler = AdaptiveScheduler(scraper.process_ticker, max_workers=args.threads,
+                                  should_retry=lambda reason: not is_final(reason))
+    start = time.time()
+    succeeded = 0
+    try:
+        while True:
+            links = journal.claim_batch(args.batch_size)
+            if not links:
+                counts = journal.counts()
+                if not counts['pending'] and not counts['in_flight']:
+                    break
+                # Other workers hold the rest; wait in case their leases expire
+                time.sleep(args.poll_interval)
+                continue
+            succeeded += scheduler.run(links)
+            for link, reason in scheduler.failures.items():
+                journal.fail(journal.ticker_of(link), reason)
+            scheduler.failures.clear()
+    finally:
+        scraper.close_outputs()
+        scraper.driver_pool.close()
+    elapsed = time.time() - start
+    print(f"Worker {journal.owner} finished {succeeded} tickers in {elapsed:.1f}s "
+          f"(HTTP fetches: {scraper.http_hits}, Selenium fallbacks: {scraper.selenium_fallbacks})")
+    return succeeded
+
+
+def print_progress(journal, start, final=False):
+    counts = journal.counts()
+    done_by_owner = journal.done_by_owner(since=start)
+    done = sum(done_by_owner.values())
+    elapsed = time.time() - start
+    rate = done / elapsed if elapsed else 0.0
+    label = "Run finished" if final else "Progress"
+    print(f"{label}: {counts['done']} done, {counts['pending']} pending, {counts['in_flight']} in flight, "
+          f"{counts['failed']} failed; {done} reports in {elapsed:.1f}s ({rate:.2f}/s aggregate)")
+    if final:
+        for owner, owner_done in sorted(done_by_owner.items()):
+            print(f"  {owner}: {owner_done} reports ({owner_done / elapsed if elapsed else 0.0:.2f}/s)")
+
+
+def run_coordinator(args):
+    """Seed the journal, start local workers and report throughput until the run finishes."""
+    os.makedirs(args.output, exist_ok=True)
+    journal = WorkJournal(args.journal, wal=not args.no_wal)
+    planner_scraper = FinancialDataScraper(args.chromedriver, args.input, args.output,
+                                           refresh_state_file=args.refresh_state)
+    links = journal.start_run(planner_scraper.get_tickers_to_refresh())
+    print(f"Queued {len(links)} tickers in {args.journal}")
+
+    server = FixtureServer(args.fixtures) if args.fixtures else None
+    base_url = server.start().base_url if server else args.base_url
+    workers = []
+    start = time.time()
+    try:
+        command = [sys.executable, os.path.abspath(__file__), "worker"]
+        for option in WORKER_OPTIONS:
+            value = getattr(args, option)
+            if value is not None:
+                command += [f"--{option.replace('_', '-')}", str(value)]
+        if base_url:
+            command += ["--base-url", base_url]
+        workers = [subprocess.Popen(command) for _ in range(args.workers)]
+
+        while True:
+            counts = journal.counts()
+            if not counts['pending'] and not counts['in_flight']:
+                break
+            if workers and all(worker.poll() is not None for worker in workers):
+                print("All local workers exited with work left in the journal")
+                break
+            time.sleep(args.poll_interval)
+            print_progress(journal, start)
+        for worker in workers:
+            worker.wait()
+    finally:
+        for worker in workers:
+            if worker.poll() is None:
+                worker.terminate()
+        if server:
+            server.stop()
+
+    print_progress(journal, start, final=True)
+    journal.print_summary()
+    planner = planner_scraper.refresh_planner
+    if planner is not None:
+        # Workers do not share the planner's JSON state; record their output here
+        for ticker, report_type in journal.done_reports():
+            filename = os.path.join(args.output, f"{ticker}_{report_type}_financial_data.csv")
+            if os.path.exists(filename):
+                planner.record_file(filename, ticker, report_type)
+        planner.save()
+
+
+def main():
+    args = build_parser().parse_args()
+    if args.role == "worker":
+        run_worker(args)
+    else:
+        run_coordinator(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""
+WebDriver Pool
+Created on Sat Oct 17 10:02:41 2026
+@author: pulkit.kushwaha
+
+A bounded pool of long-lived headless Chrome drivers shared by the scraper
+workers. Drivers are checked out and returned instead of being started and
+quit for every ticker, health-checked on checkout, and recycled after a fixed
+number of pages or when the browser grows past a memory limit.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from queue import Queue, Empty
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.common.exceptions import WebDriverException
+
+try:
+    import psutil
+except ImportError:  # memory based recycling is skipped without psutil
+    psutil = None
+
+
+class PooledDriver:
+    """A WebDriver together with the bookkeeping the pool needs to recycle it."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+        self.created_at = time.time()
+
+
+class DriverPool:
+    def __init__(self, chromedriver_path, chrome_options, max_size=5,
+                 max_pages=200, max_memory_mb=1500, checkout_timeout=300,
+                 driver_setup=None):
+        """
+        Initialize the pool. Drivers are started lazily, up to max_size.
+
+        Args:
+            chromedriver_path (str): Path to the chromedriver executable
+            chrome_options (Options): Options used for every driver
+            max_size (int): Maximum number of live drivers
+            max_pages (int): Recycle a driver after this many page loads
+            max_memory_mb (int): Recycle a driver whose browser process tree
+                uses more than this much resident memory (needs psutil)
+            checkout_timeout (int): Seconds to wait for a free driver
+            driver_setup (callable): Called with every newly started driver,
+                e.g. to enable resource blocking
+        """
+        self.chromedriver_path = chromedriver_path
+        self.chrome_options = chrome_options
+        self.max_size = max_size
+        self.max_pages = max_pages
+        self.max_memory_mb = max_memory_mb
+        if max_memory_mb and psutil is None:
+            print(f"psutil is not installed, so drivers are not recycled above {max_memory_mb} MB "
+                  f"(pip install psutil); only the {max_pages} page limit applies")
+        self.checkout_timeout = checkout_timeout
+        self.driver_setup = driver_setup
+
+        self._idle = Queue()
+        self._lock = threading.Lock()
+        self._live = 0
+        self._closed = False
+
+        # Statistics reported by summary()
+        self.started = 0
+        self.recycled = 0
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _create(self):
+        """Start a new Chrome instance."""
+        service = Service(self.chromedriver_path)
+        driver = webdriver.Chrome(service=service, options=self.chrome_options)
+        if self.driver_setup is not None:
+            self.driver_setup(driver)
+        with self._lock:
+            self.started += 1
+        return PooledDriver(driver)
+
+    @staticmethod
+    def driver_memory_mb(driver):
+        """Resident memory of chromedriver and all its Chrome children in MB."""
+        if psutil is None:
+            return 0.0
+        try:
+            process = psutil.Process(driver.service.process.pid)
+            processes = [process] + process.children(recursive=True)
+            return sum(p.memory_info().rss for p in processes) / (1024 * 1024)
+        except (psutil.Error, AttributeError):
+            return 0.0
+
+    @staticmethod
+    def _is_healthy(pooled):
+        """Check that the browser session still answers commands."""
+        try:
+            pooled.driver.execute_script("return 1")
+            return True
+        except WebDriverException:
+            return False
+
+    def _needs_recycle(self, pooled):
+        if pooled.pages >= self.max_pages:
+            return True
+        return self.max_memory_mb and self.driver_memory_mb(pooled.driver) > self.max_memory_mb
+
+    def _discard(self, pooled):
+        """Quit a driver and free its slot in the pool."""
+        try:
+            pooled.driver.quit()
+        except WebDriverException:
+            pass
+        with self._lock:
+            self._live -= 1
+
+    def acquire(self):
+        """Check out a healthy driver, starting one if the pool is not full."""
+        start = time.time()
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except Empty:
+                pooled = None
+                with self._lock:
+                    can_start = self._live < self.max_size
+                    if can_start:
+                        self._live += 1
+                if can_start:
+                    try:
+                        pooled = self._create()
+                    except Exception:
+                        with self._lock:
+                            self._live -= 1
+                        raise
+                else:
+                    remaining = self.checkout_timeout - (time.time() - start)
+                    if remaining <= 0:
+                        raise TimeoutError("Timed out waiting for a free WebDriver")
+                    try:
+                        pooled = self._idle.get(timeout=remaining)
+                    except Empty:
+                        continue
+
+            if self._is_healthy(pooled):
+                break
+            print("Discarding unhealthy WebDriver")
+            self._discard(pooled)
+
+        waited = time.time() - start
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+        return pooled
+
+    def release(self, pooled, broken=False):
+        """Return a driver to the pool, recycling it if it is worn out."""
+        if broken or self._closed or self._needs_recycle(pooled):
+            if not broken and not self._closed:
+                with self._lock:
+                    self.recycled += 1
+            self._discard(pooled)
+            return
+        self._idle.put(pooled)
+
+    @contextmanager
+    def driver(self, pages=1):
+        """
+        Context manager yielding a WebDriver from the pool.
+
+        Args:
+            pages (int): Page loads the caller makes with this checkout,
+                counted towards the recycle limit
+        """
+        pooled = self.acquire()
+        pooled.pages += pages
+        broken = False
+        try:
+            yield pooled.driver
+        except WebDriverException:
+            broken = not self._is_healthy(pooled)
+            raise
+        finally:
+            self.release(pooled, broken=broken)
+
+    def close(self):
+        """Quit every idle driver. Drivers still checked out quit on release."""
+        self._closed = True
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except Empty:
+                break
+            self._discard(pooled)
+
+    def summary(self):
+        """Return pool statistics for the run summary."""
+        with self._lock:
+            avg_wait = self.total_wait / self.checkouts if self.checkouts else 0.0
+            return {
+                "drivers_started": self.started,
+                "drivers_recycled": self.recycled,
+                "checkouts": self.checkouts,
+                "total_wait_s": round(self.total_wait, 3),
+                "avg_wait_s": round(avg_wait, 3),
+                "max_wait_s": round(self.max_wait, 3),
+            }
+
+    def print_summary(self):
+        stats = self.summary()
+        print(f"Driver pool: {stats['drivers_started']} started, "
+              f"{stats['drivers_recycled']} recycled, {stats['checkouts']} checkouts, "
+              f"pool wait avg {stats['avg_wait_s']}s / max {stats['max_wait_s']}s "
+              f"(total {stats['total_wait_s']}s)")
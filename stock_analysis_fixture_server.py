@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Local Fixture Server
+Created on Sat Oct 17 12:05:52 2026
+@author: pulkit.kushwaha
+
+Serves saved stockanalysis.com pages from a folder so the fetch paths can be
+exercised without touching the live site. Point HttpFetcher(base_url=...) or
+a browser at the server's base_url.
+
+Usage:
+    python stock_analysis_fixture_server.py <fixture_folder> [port]
+"""
+
+import os
+import re
+import sys
+import threading
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from urllib.parse import urlparse
+
+
+def fixture_filename(url):
+    """Map a URL (path and query) to a flat file name inside the fixture folder."""
+    parts = urlparse(url)
+    key = parts.path.strip('/').lower()
+    if parts.query:
+        key = f"{key}?{parts.query}"
+    return re.sub(r'[^a-z0-9._-]+', '_', key) + ".html"
+
+
+def save_fixture(fixture_folder, url, html):
+    """Save a page so the fixture server answers url with it."""
+    os.makedirs(fixture_folder, exist_ok=True)
+    filename = os.path.join(fixture_folder, fixture_filename(url))
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write(html)
+    return filename
+
+
+class FixtureRequestHandler(SimpleHTTPRequestHandler):
+    fixture_folder = "."
+
+    def do_GET(self):
+        filename = os.path.join(self.fixture_folder, fixture_filename(self.path))
+        if not os.path.exists(filename):
+            self.send_error(404, "No fixture for this URL")
+            return
+        with open(filename, 'rb') as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer:
+    def __init__(self, fixture_folder, host="127.0.0.1", port=0):
+        """Serve fixture_folder on host:port; port 0 picks a free port."""
+        handler = type("Handler", (FixtureRequestHandler,),
+                       {"fixture_folder": fixture_folder})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self.thread:
+            self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    fixture_folder = sys.argv[1] if len(sys.argv) > 1 else "fixtures"
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else 8000
+    server = FixtureServer(fixture_folder, port=port)
+    print(f"Serving {fixture_folder} at {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.httpd.server_close()
+
+if __name__ == "__main__":
+    main()
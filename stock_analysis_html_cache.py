@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+Raw HTML Cache
+Created on Sat Oct 17 16:48:35 2026
+@author: pulkit.kushwaha
+
+Keeps every fetched financials page on disk so the parser can be re-run
+without scraping again. Bodies are gzip compressed and stored once under
+their SHA-256; index.jsonl records url, ticker, report type, timestamp,
+status and hash for every fetch.
+
+Usage:
+    python stock_analysis_html_cache.py reparse <cache_folder> <output_folder> [workers]
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlparse, parse_qs
+
+from stock_analysis_parser import parse_raw_report
+
+
+def ticker_report_from_url(url):
+    """Return (TICKER, report_type) for a .../<ticker>/financials/?p=<report_type> URL."""
+    parts = urlparse(url)
+    segments = [s for s in parts.path.split('/') if s]
+    ticker = segments[-2].upper() if len(segments) >= 2 else None
+    report_type = parse_qs(parts.query).get('p', ['annual'])[0].lower()
+    return ticker, report_type
+
+
+class HtmlCache:
+    def __init__(self, cache_folder):
+        """Initialize the cache rooted at cache_folder."""
+        self.cache_folder = cache_folder
+        self.objects_folder = os.path.join(cache_folder, "objects")
+        self.index_file = os.path.join(cache_folder, "index.jsonl")
+        self.lock = threading.Lock()
+        os.makedirs(self.objects_folder, exist_ok=True)
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_folder, digest[:2], f"{digest}.html.gz")
+
+    def store(self, url, html, status=200, ticker=None, report_type=None):
+        """Store a fetched page and record it in the index. Returns the content hash."""
+        body = html.encode('utf-8')
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with gzip.open(tmp_path, 'wb') as f:
+                f.write(body)
+            os.replace(tmp_path, path)
+
+        if ticker is None or report_type is None:
+            url_ticker, url_report_type = ticker_report_from_url(url)
+            ticker = ticker or url_ticker
+            report_type = report_type or url_report_type
+        entry = {
+            "url": url,
+            "ticker": ticker,
+            "report_type": report_type,
+            "timestamp": time.time(),
+            "status": status,
+            "sha256": digest,
+        }
+        with self.lock:
+            with open(self.index_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + "\n")
+        return digest
+
+    def load(self, digest):
+        """Return the page stored under digest."""
+        with gzip.open(self._object_path(digest), 'rb') as f:
+            return f.read().decode('utf-8')
+
+    def entries(self):
+        """Yield every index entry in fetch order."""
+        if not os.path.exists(self.index_file):
+            return
+        with open(self.index_file, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+    def latest_entries(self):
+        """Return the most recent successful fetch for every (ticker, report_type)."""
+        latest = {}
+        for entry in self.entries():
+            if entry["status"] != 200:
+                continue
+            key = (entry["ticker"], entry["report_type"])
+            if key not in latest or entry["timestamp"] >= latest[key]["timestamp"]:
+                latest[key] = entry
+        return latest
+
+
+def _reparse_entry(args):
+    """Rebuild one CSV from a cached page. Runs in a worker process."""
+    cache_folder, output_folder, entry = args
+    html = HtmlCache(cache_folder).load(entry["sha256"])
+    data = parse_raw_report(html)
+    if data is None:
+        return entry["ticker"], entry["report_type"], False
+    filename = os.path.join(output_folder, f"{entry['ticker']}_{entry['report_type']}_financial_data.csv")
+    data.to_csv(filename, index=False)
+    return entry["ticker"], entry["report_type"], True
+
+
+def reparse(cache_folder, output_folder, max_workers=None):
+    """
+    Rebuild {ticker}_{report_type}_financial_data.csv for every cached page
+    using a process pool.
+
+    Returns:
+        tuple: (number of files written, number of pages without a table)
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    entries = list(HtmlCache(cache_folder).latest_entries().values())
+    start = time.time()
+    written = failed = 0
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        jobs = [(cache_folder, output_folder, entry) for entry in entries]
+        for ticker, report_type, ok in executor.map(_reparse_entry, jobs, chunksize=16):
+            if ok:
+                written += 1
+            else:
+                failed += 1
+                print(f"No raw table in cached page for {ticker} ({report_type})")
+    print(f"Reparsed {written} pages into {output_folder} in {time.time() - start:.1f}s "
+          f"({failed} without a raw table)")
+    return written, failed
+
+
+def main():
+    if len(sys.argv) < 4 or sys.argv[1] != "reparse":
+        print(__doc__)
+        return
+    workers = int(sys.argv[4]) if len(sys.argv) > 4 else None
+    reparse(sys.argv[2], sys.argv[3], workers)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+Browserless Financials Fetcher
+Created on Sat Oct 17 11:40:27 2026
+@author: pulkit.kushwaha
+
+Fetches financials pages over plain HTTP with pooled keep-alive sessions and
+parses the server-rendered table, taking the raw values from the page data
+when the table is in scaled units (see parse_raw_report). Pages without a
+table, or whose raw values cannot be recovered, are left to the Selenium
+flow.
+"""
+
+import threading
+import time
+from urllib.parse import urlparse, urlunparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from stock_analysis_parser import parse_raw_report
+
+DEFAULT_HEADERS = {
+    "User-Agent": ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                   "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+
+class HttpFetcher:
+    def __init__(self, base_url=None, pool_size=10, timeout=20, retries=2, cache=None):
+        """
+        Initialize the fetcher.
+
+        Args:
+            base_url (str): Optional scheme://host that replaces the host of
+                every requested URL, e.g. a local fixture server
+            pool_size (int): Keep-alive connections kept per host
+            timeout (int): Request timeout in seconds
+            retries (int): Retries on connection errors and 5xx responses
+            cache (HtmlCache): Optional cache every fetched page is stored in
+        """
+        self.base_url = base_url
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.retries = retries
+        self.cache = cache
+        self._local = threading.local()
+
+    def _session(self):
+        """Return this thread's session, creating it on first use."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            retry = Retry(total=self.retries, backoff_factor=0.5,
+                          status_forcelist=(500, 502, 503, 504))
+            adapter = HTTPAdapter(pool_connections=self.pool_size,
+                                  pool_maxsize=self.pool_size, max_retries=retry)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update(DEFAULT_HEADERS)
+            self._local.session = session
+        return session
+
+    def resolve(self, url):
+        """Point url at base_url when one is configured."""
+        if not self.base_url:
+            return url
+        base = urlparse(self.base_url)
+        parts = urlparse(url)
+        return urlunparse(parts._replace(scheme=base.scheme, netloc=base.netloc))
+
+    def fetch(self, url):
+        """
+        Fetch a page.
+
+        Returns:
+            tuple: (status code, page text, elapsed seconds)
+        """
+        start = time.time()
+        response = self._session().get(self.resolve(url), timeout=self.timeout)
+        return response.status_code, response.text, time.time() - start
+
+    def fetch_report(self, url):
+        """
+        Fetch and parse a financials page.
+
+        Returns:
+            tuple: (status code, DataFrame or None). The DataFrame is None when
+            the page has no table or its raw values can be read neither from
+            the table nor from the page data, meaning the Selenium flow has
+            to handle it
+        """
+        status, html, _ = self.fetch(url)
+        if self.cache is not None:
+            self.cache.store(url, html, status)
+        if status != 200:
+            return status, None
+        return status, parse_raw_report(html)
+
+    def fetch_financials(self, url):
+        """Fetch and parse a financials page, returning the DataFrame or None."""
+        return self.fetch_report(url)[1]
+
+    def close(self):
+        """Close the calling thread's session."""
+        session = getattr(self._local, "session", None)
+        if session is not None:
+            session.close()
+            self._local.session = None
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+Output Manifest
+Created on Sun Oct 18 09:12:44 2026
+@author: pulkit.kushwaha
+
+SQLite index of the {ticker}_{report_type}_financial_data files in an output
+folder, updated in a transaction on every save. Missing-ticker detection
+becomes one query and a set difference instead of several os.path.exists
+calls per ticker.
+
+Usage:
+    python stock_analysis_manifest.py rebuild <output_folder>
+"""
+
+import os
+import sys
+import threading
+import time
+
+from stock_analysis_sqlite import connect
+
+MANIFEST_NAME = "manifest.sqlite"
+FILE_SUFFIX = "_financial_data"
+EXTENSIONS = (".csv", ".xlsx")
+
+
+def parse_output_filename(filename):
+    """Return (ticker, report_type) for '<ticker>_<report_type>_financial_data.csv|xlsx', else None."""
+    stem, ext = os.path.splitext(filename)
+    if ext not in EXTENSIONS or not stem.endswith(FILE_SUFFIX):
+        return None
+    ticker, _, report_type = stem[:-len(FILE_SUFFIX)].rpartition('_')
+    if not ticker or report_type not in ('quarterly', 'annual'):
+        return None
+    return ticker, report_type
+
+
+class OutputManifest:
+    def __init__(self, output_folder, manifest_file=None):
+        """Open (creating if needed) the manifest of output_folder."""
+        self.output_folder = output_folder
+        self.manifest_file = manifest_file or os.path.join(output_folder, MANIFEST_NAME)
+        self.lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS outputs (
+                    ticker TEXT NOT NULL,
+                    report_type TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    size INTEGER,
+                    mtime REAL,
+                    saved_at REAL,
+                    PRIMARY KEY (ticker, report_type, filename)
+                )""")
+
+    def _connect(self):
+        return connect(self.manifest_file)
+
+    def record(self, ticker, report_type, path):
+        """Add or update one saved file."""
+        stat = os.stat(path)
+        with self.lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO outputs VALUES (?, ?, ?, ?, ?, ?)",
+                (ticker, report_type, os.path.basename(path), stat.st_size, stat.st_mtime, time.time()))
+
+    def record_many(self, saved):
+        """Add or update several saved files, given as (ticker, report_type, path), in one transaction."""
+        rows = []
+        for ticker, report_type, path in saved:
+            stat = os.stat(path)
+            rows.append((ticker, report_type, os.path.basename(path), stat.st_size, stat.st_mtime, time.time()))
+        with self.lock, self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO outputs VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def is_empty(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM outputs").fetchone()[0] == 0
+
+    def complete_tickers(self):
+        """Tickers that have both an annual and a quarterly file."""
+        with self._connect() as conn:
+            rows = conn.execute("""
+                SELECT ticker FROM outputs
+                GROUP BY ticker
+                HAVING COUNT(DISTINCT report_type) = 2""").fetchall()
+        return {row[0] for row in rows}
+
+    def missing(self, tickers):
+        """Return the tickers, in input order, that lack an annual or quarterly file."""
+        complete = self.complete_tickers()
+        return [ticker for ticker in tickers if ticker not in complete]
+
+    def rebuild(self):
+        """Regenerate the manifest from a single scan of the output folder."""
+        rows = []
+        with os.scandir(self.output_folder) as entries:
+            for entry in entries:
+                parsed = parse_output_filename(entry.name)
+                if parsed is None or not entry.is_file():
+                    continue
+                stat = entry.stat()
+                rows.append((parsed[0], parsed[1], entry.name, stat.st_size, stat.st_mtime, stat.st_mtime))
+        with self.lock, self._connect() as conn:
+            conn.execute("DELETE FROM outputs")
+            conn.executemany("INSERT OR REPLACE INTO outputs VALUES (?, ?, ?, ?, ?, ?)", rows)
+        print(f"Manifest rebuilt with {len(rows)} files from {self.output_folder}")
+        return len(rows)
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1] != "rebuild":
+        print(__doc__)
+        return
+    OutputManifest(sys.argv[2]).rebuild()
+
+if __name__ == "__main__":
+    main()
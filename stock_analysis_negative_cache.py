@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+Negative Result Cache
+Created on Sun Oct 18 17:08:31 2026
+@author: pulkit.kushwaha
+
+Remembers tickers that produced nothing usable and why: the page does not
+exist, it has no financials table, every value is paywalled ("Upgrade"), or
+it timed out. Each reason has its own TTL, and tickers are skipped by the
+scraper until their entry expires. The cache lives in the output folder so
+the combine script can record paywalled tickers in the same place.
+
+Usage:
+    python stock_analysis_negative_cache.py status <output_folder>
+    python stock_analysis_negative_cache.py clear <output_folder> [ticker ...]
+"""
+
+import os
+import sys
+import threading
+import time
+
+from stock_analysis_sqlite import connect
+
+NEGATIVE_CACHE_NAME = "negative_cache.sqlite"
+
+NOT_FOUND = 'not_found'
+NO_TABLE = 'no_table'
+PAYWALLED = 'paywalled'
+TIMEOUT = 'timeout'
+# The browser failed (crashed, session lost); says nothing about the ticker
+# and is never cached
+BROWSER_ERROR = 'browser_error'
+
+# Days a ticker is skipped for each reason
+DEFAULT_TTL_DAYS = {
+    NOT_FOUND: 90,
+    NO_TABLE: 30,
+    PAYWALLED: 60,
+    TIMEOUT: 1,
+}
+
+# Reasons that another attempt in the same run will not change
+FINAL_REASONS = (NOT_FOUND, NO_TABLE, PAYWALLED)
+REASON_CODES = tuple(DEFAULT_TTL_DAYS) + (BROWSER_ERROR,)
+
+
+def reason_code(reason):
+    """Code of a '<code>: <detail>' failure reason, or None if it has none."""
+    code = str(reason).split(':', 1)[0]
+    return code if code in REASON_CODES else None
+
+
+def ticker_reason(codes):
+    """
+    One code for a ticker from the codes of its failed reports: not_found
+    only when every report was missing, otherwise the most retryable code,
+    so a transient failure of one report is never cached as final.
+    """
+    if codes and all(code == NOT_FOUND for code in codes):
+        return NOT_FOUND
+    for code in (BROWSER_ERROR, TIMEOUT):
+        if code in codes:
+            return code
+    return NO_TABLE
+
+
+def is_final(reason):
+    """True for failure reasons that are not worth retrying in the same run."""
+    return reason_code(reason) in FINAL_REASONS
+
+
+class NegativeCache:
+    def __init__(self, output_folder, cache_file=None, ttl_days=None):
+        """
+        Open (creating if needed) the negative cache of output_folder.
+
+        Args:
+            output_folder (str): Folder of the per-ticker output files
+            cache_file (str): SQLite file, <output_folder>/negative_cache.sqlite by default
+            ttl_days (dict): Overrides of DEFAULT_TTL_DAYS by reason
+        """
+        self.cache_file = cache_file or os.path.join(output_folder, NEGATIVE_CACHE_NAME)
+        self.ttl_days = dict(DEFAULT_TTL_DAYS, **(ttl_days or {}))
+        self.lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS negative (
+                    ticker TEXT PRIMARY KEY,
+                    reason TEXT NOT NULL,
+                    detail TEXT,
+                    first_seen REAL,
+                    last_seen REAL,
+                    hits INTEGER NOT NULL DEFAULT 1,
+                    expires_at REAL NOT NULL
+                )""")
+
+    def _connect(self):
+        return connect(self.cache_file)
+
+    def record(self, ticker, reason, detail=None):
+        """Skip ticker for the TTL of reason, counting repeated hits."""
+        now = time.time()
+        expires_at = now + self.ttl_days[reason] * 86400
+        with self.lock, self._connect() as conn:
+            conn.execute("""
+                INSERT INTO negative VALUES (?, ?, ?, ?, ?, 1, ?)
+                ON CONFLICT(ticker) DO UPDATE SET
+                    reason = excluded.reason, detail = excluded.detail,
+                    last_seen = excluded.last_seen, hits = hits + 1,
+                    expires_at = excluded.expires_at""",
+                (ticker, reason, detail, now, now, expires_at))
+
+    def clear(self, tickers=None):
+        """Forget the given tickers, or every entry when tickers is None."""
+        with self.lock, self._connect() as conn:
+            if tickers is None:
+                conn.execute("DELETE FROM negative")
+            else:
+                conn.executemany("DELETE FROM negative WHERE ticker = ?", [(t,) for t in tickers])
+
+    def active(self, now=None):
+        """Tickers whose entry has not expired yet."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT ticker FROM negative WHERE expires_at > ?",
+                                (now or time.time(),)).fetchall()
+        return {row[0] for row in rows}
+
+    def print_summary(self):
+        now = time.time()
+        with self._connect() as conn:
+            rows = conn.execute("""
+                SELECT reason, SUM(expires_at > ?), COUNT(*) FROM negative
+                GROUP BY reason ORDER BY reason""", (now,)).fetchall()
+        print("Negative cache: " + (", ".join(f"{active} {reason} ({total - active} expired)"
+                                              for reason, active, total in rows) or "empty"))
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1] not in ("status", "clear"):
+        print(__doc__)
+        return
+    cache = NegativeCache(sys.argv[2])
+    if sys.argv[1] == "clear":
+        cache.clear(sys.argv[3:] or None)
+    cache.print_summary()
+
+if __name__ == "__main__":
+    main()
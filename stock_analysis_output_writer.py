@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+Write-Behind Output Writer
+Created on Sun Oct 18 19:15:26 2026
+@author: pulkit.kushwaha
+
+Takes finished tables off the browser threads. Results go into a bounded
+queue that one writer thread drains in batches, so the threads that own a
+browser return to scraping immediately. When the writer falls behind the
+queue fills up and put() blocks, which slows the scrapers down instead of
+letting memory grow without bound.
+"""
+
+import queue
+import threading
+import time
+
+_STOP = object()
+
+
+class OutputWriter:
+    def __init__(self, write_batch, max_queue=64, max_batch=32):
+        """
+        Start the writer thread.
+
+        Args:
+            write_batch (callable): Called on the writer thread with a list of
+                queued items; writes and records them
+            max_queue (int): Items held before put() blocks
+            max_batch (int): Most items handed to write_batch at once
+        """
+        self.write_batch = write_batch
+        self.max_batch = max_batch
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.lock = threading.Lock()
+
+        # Statistics reported by print_summary()
+        self.written = 0
+        self.batches = 0
+        self.errors = 0
+        self.write_time = 0.0
+        self.blocked_puts = 0
+        self.blocked_time = 0.0
+        self.max_depth = 0
+
+        self.thread = threading.Thread(target=self._run, name="output-writer", daemon=True)
+        self.thread.start()
+
+    def put(self, item):
+        """Queue an item, blocking while the queue is full."""
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            start = time.time()
+            self.queue.put(item)
+            with self.lock:
+                self.blocked_puts += 1
+                self.blocked_time += time.time() - start
+        with self.lock:
+            self.max_depth = max(self.max_depth, self.queue.qsize())
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            stop = False
+            while len(batch) < self.max_batch:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            start = time.time()
+            try:
+                self.write_batch(batch)
+                self.written += len(batch)
+            except Exception as e:
+                self.errors += len(batch)
+                print(f"Output writer failed on a batch of {len(batch)}: {str(e)}")
+            self.batches += 1
+            self.write_time += time.time() - start
+            if stop:
+                return
+
+    def close(self):
+        """Write everything still queued and stop the thread."""
+        if self.thread.is_alive():
+            self.queue.put(_STOP)
+            self.thread.join()
+
+    def print_summary(self):
+        avg_batch = self.written / self.batches if self.batches else 0.0
+        print(f"Output writer: {self.written} written in {self.batches} batches "
+              f"(avg {avg_batch:.1f}/batch, {self.write_time:.1f}s writing), {self.errors} errors, "
+              f"queue peaked at {self.max_depth}, producers blocked {self.blocked_puts} times "
+              f"for {self.blocked_time:.1f}s")
@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+"""
+Financials Page Parser
+Created on Sat Oct 17 11:15:03 2026
+@author: pulkit.kushwaha
+
+Turns a stockanalysis.com financials page into the DataFrame written to
+{ticker}_{report_type}_financial_data.csv. Shared by the Selenium and the
+plain HTTP fetch paths so both produce identical output.
+
+A page fetched without a browser shows the table in the default scaled
+units ("Financials in millions USD"), but its inline page data holds the
+unscaled numbers. parse_raw_report matches every scaled table row to the
+page data series it was rounded from and writes the raw values into the
+table, so headers and labels stay exactly those of the Raw view.
+"""
+
+import re
+
+import pandas as pd
+from bs4 import BeautifulSoup
+
+from stock_analysis_periods import parse_period_date
+
+try:
+    import lxml.html
+except ImportError:  # falls back to the BeautifulSoup parser
+    lxml = None
+
+CURRENCY_DIV_CLASS = "hidden pb-1 text-sm text-faded lg:block"
+# Opening tag of the currency/fiscal div, whatever attributes come before or after class
+CURRENCY_DIV_TAG = re.compile(
+    r'<div\b[^>]*?\sclass\s*=\s*(["\'])' + re.escape(CURRENCY_DIV_CLASS) + r'\1[^>]*>', re.IGNORECASE)
+SCALED_UNITS = ("thousand", "million", "billion")
+UNIT_SCALES = {"thousand": 1e3, "million": 1e6, "billion": 1e9}
+UNITS_LINE_PREFIX = "financials in"
+
+INLINE_SCRIPT = re.compile(r'<script\b[^>]*>(.*?)</script>', re.DOTALL | re.IGNORECASE)
+# key: [scalar, ...] arrays of the page data; nested arrays and objects are skipped
+PAGE_DATA_ARRAY = re.compile(r'([A-Za-z_$][\w$]*|"[\w$]+")\s*:\s*\[([^\[\]{}]*)\]')
+PAGE_DATA_DATE = re.compile(r'^"(\d{4}-\d{2}-\d{2})"$')
+PAGE_DATA_NUMBER = re.compile(r'^-?(\d+\.?\d*|\.\d+)(e[+-]?\d+)?$', re.IGNORECASE)
+PAGE_DATA_NULLS = ('null', 'void 0', 'undefined', 'NaN', '')
+TABLE_NUMBER = re.compile(r'^-?[\d,]*\.?\d+$')
+
+
+def split_currency_fiscal(text):
+    """Split 'Financials in USD. Fiscal year is ...' into (currency, fiscal_year)."""
+    currency = "N/A"
+    fiscal_year = "N/A"
+    if text is not None:
+        currency_fiscal = text.split('.')
+        if currency_fiscal:
+            currency = currency_fiscal[0].strip()
+        if len(currency_fiscal) > 1:
+            fiscal_year = currency_fiscal[1].strip()
+    return currency, fiscal_year
+
+
+def parse_currency_fiscal(element):
+    """Currency and fiscal year from the currency/fiscal div, 'N/A' when it is missing."""
+    return split_currency_fiscal(element.text if element else None)
+
+
+def is_raw_units(currency):
+    """
+    True when the units line was recognised and shows raw values, e.g.
+    'Financials in USD' rather than 'Financials in millions USD'. A missing
+    or unrecognised line ('N/A') is not raw: the table may be scaled.
+    """
+    text = (currency or '').strip().lower()
+    if not text.startswith(UNITS_LINE_PREFIX):
+        return False
+    return not any(unit in text for unit in SCALED_UNITS)
+
+
+def _build_dataframe(headers, data, currency, fiscal_year):
+    """DataFrame from header cell texts (one list per header row) and data row texts."""
+    columns = (pd.MultiIndex.from_tuples(zip(headers[0], headers[1]))
+               if len(headers) == 2 else headers[0])
+
+    table_df = pd.DataFrame(data, columns=columns)
+    table_df['Currency'] = currency
+    table_df['Fiscal_Year_period'] = fiscal_year
+    return table_df
+
+
+def process_table_data(table, currency, fiscal_year):
+    """Process the scraped table and convert to DataFrame."""
+    rows = table.find_all('tr')
+    headers = []
+    for row in rows[:2]:
+        headers.append([th.text.strip() for th in row.find_all('th')])
+
+    data = []
+    for row in rows[2:]:
+        cols = row.find_all('td')
+        if cols:
+            data.append([col.text.strip() for col in cols])
+
+    return _build_dataframe(headers, data, currency, fiscal_year)
+
+
+def _parse_page_bs4(html):
+    """Reference parser: full BeautifulSoup tree with the pure-Python html.parser."""
+    soup = BeautifulSoup(html, 'html.parser')
+    table = soup.find('table')
+    element = soup.find('div', class_=CURRENCY_DIV_CLASS)
+    currency, fiscal_year = parse_currency_fiscal(element)
+    if table is None:
+        return None, currency, fiscal_year
+    return process_table_data(table, currency, fiscal_year), currency, fiscal_year
+
+
+def _parse_page_lxml(html):
+    """
+    Fast parser: cut the first <table> and the currency/fiscal div out of the
+    page text and parse only those fragments with lxml.
+    """
+    currency, fiscal_year = split_currency_fiscal(None)
+    match = CURRENCY_DIV_TAG.search(html)
+    if match:
+        div_start = match.start()
+        div_end = html.find('</div>', div_start)
+        if div_end != -1:
+            div = lxml.html.fragment_fromstring(html[div_start:div_end + len('</div>')])
+            currency, fiscal_year = split_currency_fiscal(div.text_content())
+
+    table_start = html.find('<table')
+    table_end = html.find('</table>', table_start)
+    if table_start == -1 or table_end == -1:
+        return None, currency, fiscal_year
+    table = lxml.html.fragment_fromstring(html[table_start:table_end + len('</table>')])
+
+    rows = list(table.iter('tr'))
+    headers = []
+    for row in rows[:2]:
+        headers.append([th.text_content().strip() for th in row.iter('th')])
+
+    data = []
+    for row in rows[2:]:
+        cols = [td.text_content().strip() for td in row.iter('td')]
+        if cols:
+            data.append(cols)
+
+    return _build_dataframe(headers, data, currency, fiscal_year), currency, fiscal_year
+
+
+PARSERS = {'bs4': _parse_page_bs4}
+if lxml is not None:
+    PARSERS['lxml'] = _parse_page_lxml
+DEFAULT_PARSER = 'lxml' if lxml is not None else 'bs4'
+
+
+def parse_financials_page(html, backend=None):
+    """
+    Parse a financials page.
+
+    Args:
+        html (str): Page source
+        backend (str): 'lxml' (table-scoped, default when lxml is installed)
+            or 'bs4' (full BeautifulSoup tree)
+
+    Returns:
+        tuple: (DataFrame or None if the page has no table, currency, fiscal_year)
+    """
+    return PARSERS[backend or DEFAULT_PARSER](html)
+
+
+def parse_page_data(html):
+    """
+    Period end dates and numeric series of the page data in the inline
+    scripts.
+
+    Returns:
+        tuple: (list of period end Timestamps, list of series with one
+        float or None per period), ([], []) when the page has none
+    """
+    arrays = []
+    for script in INLINE_SCRIPT.findall(html):
+        arrays.extend(PAGE_DATA_ARRAY.findall(script))
+    dates = None
+    series = []
+    for key, body in arrays:
+        items = [item.strip() for item in body.split(',')] if body.strip() else []
+        if items and all(PAGE_DATA_DATE.match(item) for item in items):
+            # The period end array (datekey); the first one wins
+            if dates is None or key.strip('"') == 'datekey':
+                dates = [pd.Timestamp(PAGE_DATA_DATE.match(item).group(1)) for item in items]
+            continue
+        if items and all(item in PAGE_DATA_NULLS or PAGE_DATA_NUMBER.match(item) for item in items):
+            series.append([None if item in PAGE_DATA_NULLS else float(item) for item in items])
+    if not dates:
+        return [], []
+    return dates, [values for values in series if len(values) == len(dates)]
+
+
+def _table_number(text):
+    """(value, decimals) of a table cell such as '391,035.5', None for anything else."""
+    text = str(text).strip()
+    if not TABLE_NUMBER.match(text):
+        return None
+    decimals = len(text.split('.', 1)[1]) if '.' in text else 0
+    return float(text.replace(',', '')), decimals
+
+
+def _format_raw(value):
+    """A page data value as the Raw view shows it."""
+    return f"{int(value):,}" if float(value).is_integer() else f"{value:,}"
+
+
+def _series_matches(values, cells, scale):
+    """True when every numeric cell is values[period] / scale, rounded as shown."""
+    for period, (shown, decimals) in cells:
+        value = values[period]
+        if value is None or abs(value / scale - shown) > 0.5 * 10 ** -decimals + 1e-9 * abs(shown):
+            return False
+    return True
+
+
+def unscale_table(data, currency, html):
+    """
+    Raw copy of a table shown in scaled units, with the values of the
+    page data.
+
+    Args:
+        data (DataFrame): Table as parsed from the page
+        currency (str): Units line, e.g. 'Financials in millions USD'
+        html (str): Page source with the inline page data
+
+    Returns:
+        DataFrame or None: None when the units are unknown or a scaled row
+        cannot be matched to a page data series
+    """
+    text = (currency or '').strip().lower()
+    scales = [scale for unit, scale in UNIT_SCALES.items() if unit in text]
+    if not text.startswith(UNITS_LINE_PREFIX) or not scales:
+        return None
+    dates, series = parse_page_data(html)
+    if not series:
+        return None
+    period_of = {date: i for i, date in enumerate(dates)}
+
+    # Table column -> page data period, by period end; teaser columns have none
+    periods = {}
+    for position, column in enumerate(data.columns[1:], start=1):
+        label = column[1] if isinstance(column, tuple) else column
+        date = parse_period_date(label)
+        if date is not None and pd.Timestamp(date) in period_of:
+            periods[position] = period_of[pd.Timestamp(date)]
+
+    raw = data.copy()
+    for row in range(len(data)):
+        cells, positions = [], []
+        for position, period in periods.items():
+            number = _table_number(data.iat[row, position])
+            if number is not None:
+                cells.append((period, number))
+                positions.append(position)
+        if not cells:
+            continue  # placeholders, paywalled cells and percentages read the same in every unit
+        if any(_series_matches(values, cells, 1.0) for values in series):
+            continue  # per-share values and ratios are not scaled
+        match = next((values for values in series if _series_matches(values, cells, scales[0])), None)
+        if match is None:
+            return None
+        for position, (period, _) in zip(positions, cells):
+            raw.iat[row, position] = _format_raw(match[period])
+
+    raw_currency = f"Financials in {currency.split(' ')[-1]}"
+    for column in raw.columns:
+        if (column[0] if isinstance(column, tuple) else column) == 'Currency':
+            raw[column] = raw_currency
+    return raw
+
+
+def parse_raw_report(html):
+    """
+    Raw-units table of a financials page: the table itself when it already
+    shows raw values, else the table with the page data values written in.
+
+    Returns:
+        DataFrame or None: None when the page has no table or its raw
+        values cannot be recovered, meaning a browser has to handle it
+    """
+    data, currency, _ = parse_financials_page(html)
+    if data is None:
+        return None
+    if is_raw_units(currency):
+        return data
+    return unscale_table(data, currency, html)
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Parser Benchmark
+Created on Sun Oct 18 10:37:09 2026
+@author: pulkit.kushwaha
+
+Compares the financials page parser backends over saved pages: per-page
+parse time, peak memory, and whether each backend produces the same
+DataFrame as the BeautifulSoup reference, also on copies of the pages
+with the currency/fiscal div's attributes reordered.
+
+Usage:
+    python stock_analysis_parser_benchmark.py <pages_folder> [repeat]
+
+pages_folder may hold .html files (e.g. a fixture folder) or an HTML cache
+folder with .html.gz objects.
+"""
+
+import gzip
+import os
+import sys
+import time
+import tracemalloc
+
+from stock_analysis_parser import CURRENCY_DIV_CLASS, PARSERS
+
+
+def load_pages(pages_folder):
+    """Read every .html / .html.gz file below pages_folder."""
+    pages = []
+    for root, _, files in os.walk(pages_folder):
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            if name.endswith('.html.gz'):
+                with gzip.open(path, 'rb') as f:
+                    pages.append((name, f.read().decode('utf-8')))
+            elif name.endswith('.html'):
+                with open(path, encoding='utf-8') as f:
+                    pages.append((name, f.read()))
+    return pages
+
+
+def benchmark(pages, backend, repeat=3):
+    """Return (mean seconds per page, peak traced memory in MB) for one backend."""
+    parse = PARSERS[backend]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for _, html in pages:
+            parse(html)
+    per_page = (time.perf_counter() - start) / (repeat * len(pages))
+
+    peak = 0
+    for _, html in pages:
+        tracemalloc.start()
+        parse(html)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return per_page, peak / (1024 * 1024)
+
+
+def markup_variants(pages):
+    """
+    Copies of the pages whose currency/fiscal div carries attributes before
+    and after class, as other page builds may emit, plus a minimal page in
+    case none of the saved pages has that div.
+    """
+    plain = f'<div class="{CURRENCY_DIV_CLASS}"'
+    variants = [(f"{name} [attributes around class]",
+                 html.replace(plain, f'<div id="units" class="{CURRENCY_DIV_CLASS}" data-x="1"', 1))
+                for name, html in pages if plain in html]
+    variants.append(("minimal [id before class]",
+                     f'<html><div id="units" class="{CURRENCY_DIV_CLASS}">Financials in millions USD. '
+                     'Fiscal year is January - December.</div><table><tr><th>Fiscal Year</th>'
+                     '<th>FY 2023</th></tr><tr><th>Period Ending</th><th>Dec 31, 2023</th></tr>'
+                     '<tr><td>Revenue</td><td>1,000</td></tr></table></html>'))
+    return variants
+
+
+def check_equal(pages, backend, reference='bs4'):
+    """Names of pages where backend's DataFrame differs from the reference."""
+    mismatches = []
+    for name, html in pages:
+        expected, *expected_meta = PARSERS[reference](html)
+        actual, *actual_meta = PARSERS[backend](html)
+        if expected is None or actual is None:
+            same = expected is None and actual is None
+        else:
+            same = expected.equals(actual) and list(expected.columns) == list(actual.columns)
+        if not same or expected_meta != actual_meta:
+            mismatches.append(name)
+    return mismatches
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    pages = load_pages(sys.argv[1])
+    if not pages:
+        print(f"No saved pages found in {sys.argv[1]}")
+        return
+    print(f"Benchmarking {len(pages)} pages, {repeat} rounds")
+
+    results = {backend: benchmark(pages, backend, repeat) for backend in PARSERS}
+    reference_time = results['bs4'][0]
+    for backend, (per_page, peak_mb) in results.items():
+        mismatches = check_equal(pages + markup_variants(pages), backend) if backend != 'bs4' else []
+        print(f"{backend:>5}: {per_page * 1000:8.2f} ms/page  peak {peak_mb:7.2f} MB  "
+              f"speedup {reference_time / per_page:5.1f}x  mismatches {len(mismatches)}")
+        for name in mismatches[:10]:
+            print(f"       differs: {name}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Period Labels
+Created on Sun Oct 18 22:37:05 2026
+@author: pulkit.kushwaha
+
+Parses the period ending labels of the scraped tables, such as
+"Sep '24 Sep 30, 2024" (quarterly) and "September 30, 2024" (annual), into
+dates. The refresh planner parses the labels of one table at a time; the
+dataset, the combine engine and the revenue combine script parse whole
+columns with parse_period_dates.
+"""
+
+import re
+from datetime import datetime
+
+import pandas as pd
+
+PERIOD_DATE = re.compile(r"([A-Z][a-z]+ \d{1,2}, \d{4})$")
+
+# Parsed period labels, shared by every parse_period_dates call in the process
+_period_date_cache = {}
+PERIOD_DATE_CACHE_SIZE = 100000
+
+
+def parse_period_date(label):
+    """Return the date in a 'Sep '24 Sep 30, 2024' or 'September 30, 2024' label, or None."""
+    match = PERIOD_DATE.search(str(label).strip())
+    if not match:
+        return None
+    for fmt in ('%b %d, %Y', '%B %d, %Y'):
+        try:
+            return datetime.strptime(match.group(1), fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def parse_period_dates(labels):
+    """
+    Vectorized parse_period_date: datetime64 Series for an iterable of
+    period labels, NaT where no date is found. Each distinct label is
+    parsed once and remembered, so later calls only parse labels they have
+    not seen; the results are broadcast back to every row.
+    """
+    labels = pd.Series(labels, dtype=object)
+    unique = labels.dropna().unique()
+    # Taken before the cache may be cleared below
+    known = {label: _period_date_cache[label] for label in unique if label in _period_date_cache}
+    new = pd.Series([label for label in unique if label not in known], dtype=object)
+    if len(new):
+        dates = new.astype(str).str.strip().str.extract(PERIOD_DATE, expand=False)
+        parsed = pd.to_datetime(dates, format='%b %d, %Y', errors='coerce')
+        parsed = parsed.fillna(pd.to_datetime(dates, format='%B %d, %Y', errors='coerce'))
+        known.update(zip(new, parsed))
+        if len(_period_date_cache) + len(new) > PERIOD_DATE_CACHE_SIZE:
+            _period_date_cache.clear()
+        _period_date_cache.update(zip(new, parsed))
+    lookup = pd.Series([known[label] for label in unique], index=unique, dtype='datetime64[ns]')
+    return pd.Series(lookup.reindex(labels.values).values, index=labels.index)
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+Incremental Refresh Planner
+Created on Sat Oct 17 19:31:06 2026
+@author: pulkit.kushwaha
+
+Records when each ticker was scraped, the latest period its tables contained
+and its fiscal year, and decides which tickers are worth scraping again:
+those whose next quarterly or annual report is probably out by now, and
+those whose data is older than a TTL.
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from stock_analysis_periods import parse_period_date
+
+REPORT_TYPES = ('quarterly', 'annual')
+MONTHS = ['january', 'february', 'march', 'april', 'may', 'june', 'july',
+          'august', 'september', 'october', 'november', 'december']
+
+
+def fiscal_year_end_month(fiscal_year_period):
+    """Month number the fiscal year ends in, from 'Fiscal year is July - June'. Defaults to December."""
+    text = str(fiscal_year_period).lower()
+    if ' - ' in text:
+        end = text.rsplit(' - ', 1)[1].strip()
+        for i, month in enumerate(MONTHS):
+            if end.startswith(month):
+                return i + 1
+    return 12
+
+
+def _month_end(year, month):
+    """Last day of the given month."""
+    if month == 12:
+        return datetime(year, 12, 31)
+    return datetime(year, month + 1, 1) - timedelta(days=1)
+
+
+def next_period_end(latest_period_end, report_type, fiscal_year_period):
+    """Period end of the report that follows latest_period_end."""
+    if report_type == 'quarterly':
+        month = latest_period_end.month + 3
+        year = latest_period_end.year + (month - 1) // 12
+        return _month_end(year, (month - 1) % 12 + 1)
+    end_month = fiscal_year_end_month(fiscal_year_period)
+    year = latest_period_end.year
+    candidate = _month_end(year, end_month)
+    if candidate <= latest_period_end:
+        candidate = _month_end(year + 1, end_month)
+    return candidate
+
+
+def summarize_table(df):
+    """Return (latest period end or None, fiscal year text) of a scraped table."""
+    labels = []
+    if isinstance(df.columns, pd.MultiIndex):
+        labels = [col[1] for col in df.columns]
+    dates = [d for d in (parse_period_date(label) for label in labels) if d is not None]
+    fiscal_year_period = None
+    fiscal_columns = [col for col in df.columns
+                      if (col[0] if isinstance(col, tuple) else col) == 'Fiscal_Year_period']
+    if fiscal_columns and len(df):
+        fiscal_year_period = str(df[fiscal_columns[0]].iloc[0])
+    return (max(dates) if dates else None), fiscal_year_period
+
+
+class RefreshPlanner:
+    def __init__(self, state_file, ttl_days=30, quarterly_lag_days=45, annual_lag_days=90):
+        """
+        Initialize the planner.
+
+        Args:
+            state_file (str): JSON file the scrape history is kept in
+            ttl_days (int): Re-scrape anything older than this regardless
+            quarterly_lag_days (int): Days after a quarter ends before its
+                report is expected on the site
+            annual_lag_days (int): Same for annual reports
+        """
+        self.state_file = state_file
+        self.ttl = timedelta(days=ttl_days)
+        self.lag_days = {'quarterly': quarterly_lag_days, 'annual': annual_lag_days}
+        self.lock = threading.Lock()
+        self.state = {}
+        if os.path.exists(state_file):
+            with open(state_file, encoding='utf-8') as f:
+                self.state = json.load(f)
+
+    def record(self, ticker, report_type, df, scraped_at=None):
+        """Remember that ticker's report_type table was just scraped."""
+        latest, fiscal_year_period = summarize_table(df)
+        entry = {
+            "scraped_at": scraped_at or time.time(),
+            "latest_period_end": latest.strftime('%Y-%m-%d') if latest else None,
+            "fiscal_year_period": fiscal_year_period,
+        }
+        with self.lock:
+            self.state.setdefault(ticker, {})[report_type] = entry
+
+    def record_file(self, filename, ticker, report_type):
+        """Seed the state from an existing output CSV, using its modification time."""
+        df = pd.read_csv(filename, header=[0, 1], nrows=1)
+        self.record(ticker, report_type, df, scraped_at=os.path.getmtime(filename))
+
+    def due_reason(self, ticker, now=None):
+        """
+        Return why ticker should be scraped again, or None if it is up to date.
+        Reasons are 'not scraped', 'expired' and 'new period'.
+        """
+        now = now or datetime.now()
+        with self.lock:
+            reports = dict(self.state.get(ticker, {}))
+        for report_type in REPORT_TYPES:
+            entry = reports.get(report_type)
+            if entry is None:
+                return "not scraped"
+            scraped_at = datetime.fromtimestamp(entry["scraped_at"])
+            if now - scraped_at > self.ttl:
+                return "expired"
+            if entry["latest_period_end"]:
+                latest = datetime.strptime(entry["latest_period_end"], '%Y-%m-%d')
+                expected = next_period_end(latest, report_type, entry["fiscal_year_period"])
+                available = expected + timedelta(days=self.lag_days[report_type])
+                if scraped_at < available <= now:
+                    return "new period"
+        return None
+
+    def plan(self, tickers, now=None):
+        """Return the subset of tickers that should be scraped again."""
+        due = []
+        reasons = {}
+        for ticker in tickers:
+            reason = self.due_reason(ticker, now)
+            if reason:
+                due.append(ticker)
+                reasons[reason] = reasons.get(reason, 0) + 1
+        print(f"Refresh plan: {len(due)} of {len(tickers)} tickers due {reasons}")
+        return due
+
+    def save(self):
+        """Write the state file atomically."""
+        with self.lock:
+            tmp_file = f"{self.state_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(self.state, f)
+            os.replace(tmp_file, self.state_file)
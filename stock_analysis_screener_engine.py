@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+Screener Engine
+Created on Sun Oct 18 12:46:30 2026
+@author: pulkit.kushwaha
+
+Runs stockanalysis.com screener queries described as (market, sector,
+industry) specs. Every spec is scraped start to finish in its own browser
+session, specs run in parallel sessions, and all rows are merged and
+de-duplicated by Symbol into one output. A spec's pages are not split
+across sessions: the screener has no way to open a page directly, so a
+session starting at page N would first have to click through pages 1..N-1.
+"""
+
+import re
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+
+from stock_analysis_driver_pool import DriverPool
+from stock_analysis_browser_profile import configure_chrome_options, BLOCKED_URL_PATTERNS
+from stock_analysis_screener_utils import (extract_main_table, table_state, table_changed,
+                                           WaitTimer, PopupSuppressor, PAGE_INFO_SELECTOR,
+                                           NEWSLETTER_URL_PATTERNS)
+
+SCREENER_URL = "https://stockanalysis.com/stocks/screener/"
+TABLE_ID = 'main-table'
+FILTER_DROPDOWN_XPATH = ("//div[contains(text(),'{name}')]/following-sibling::div"
+                         "//div[contains(@class, 'relative inline-block text-left')]"
+                         "//button[contains(@class, 'controls-btn')]")
+MARKET_BUTTON_XPATH = "//button[@class='controls-btn' and .//div[text()='US']]"
+# Options of the market dropdown that cannot be found by their text
+MARKET_OPTION_XPATHS = {
+    'US OTC': "/html/body/div/div[1]/div[2]/main/div[1]/div[2]/div[1]/div[2]/div/div[2]/button[2]",
+}
+
+
+class ScreenerSpec(namedtuple('ScreenerSpec', ['market', 'sector', 'industry'])):
+    """One screener query, e.g. ScreenerSpec('US OTC', 'Healthcare', 'Biotechnology')."""
+
+
+class ScreenerEngine:
+    def __init__(self, chromedriver_path, browser_profile='lean', max_workers=4,
+                 wait_timeout=10, table_change_timeout=20):
+        """
+        Initialize the engine.
+
+        Args:
+            chromedriver_path (str): Path to the chromedriver executable
+            browser_profile (str): 'default' or 'lean' Chrome profile
+            max_workers (int): Browser sessions (specs) run in parallel
+            wait_timeout (int): Seconds to wait for an element
+            table_change_timeout (int): Seconds to wait for the table to redraw
+        """
+        self.max_workers = max_workers
+        self.table_change_timeout = table_change_timeout
+        self.waits = WaitTimer(wait_timeout)
+        blocked = NEWSLETTER_URL_PATTERNS + (BLOCKED_URL_PATTERNS if browser_profile == 'lean' else [])
+        self.popups = PopupSuppressor(blocked)
+        self.driver_pool = DriverPool(chromedriver_path, configure_chrome_options(browser_profile),
+                                      max_size=max_workers,
+                                      driver_setup=self.popups.install)
+
+    def _click(self, driver, xpath, name):
+        element = self.waits.until(driver, EC.element_to_be_clickable((By.XPATH, xpath)), name)
+        self.popups.click(driver, element)
+
+    def _click_and_wait_for_table(self, driver, xpath, name, required=False):
+        """Click an element that changes the table and wait for the redraw."""
+        element = self.waits.until(driver, EC.element_to_be_clickable((By.XPATH, xpath)), name)
+        state = table_state(driver, TABLE_ID)
+        self.popups.click(driver, element)
+        return self.waits.until(driver, table_changed(state, TABLE_ID), f"table after {name}",
+                                self.table_change_timeout, required=required)
+
+    def _apply_spec(self, driver, spec):
+        """Open a fresh screener and apply the market, sector and industry filters."""
+        self.popups.navigate(driver, SCREENER_URL)
+        # Screener filters can be remembered by the site; start every session clean
+        driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+        self.popups.navigate(driver, SCREENER_URL)
+
+        if spec.market != 'US':
+            self._click(driver, MARKET_BUTTON_XPATH, "market dropdown")
+            option_xpath = MARKET_OPTION_XPATHS.get(spec.market, f"//button[normalize-space()='{spec.market}']")
+            self._click_and_wait_for_table(driver, option_xpath, "market option")
+
+        self._click(driver, "//button[.//div[text()='Add Filters']]", "add filters")
+        self._click(driver, "//label[contains(text(),'Sector')]", "sector filter")
+        self._click(driver, "//label[contains(text(),'Industry')]", "industry filter")
+
+        self._click(driver, FILTER_DROPDOWN_XPATH.format(name='Sector'), "sector dropdown")
+        self._click_and_wait_for_table(driver, f"//label[contains(text(),'{spec.sector}')]", "sector option")
+
+        self._click(driver, FILTER_DROPDOWN_XPATH.format(name='Industry'), "industry dropdown")
+        self._click_and_wait_for_table(driver, f"//label[contains(text(),'{spec.industry}')]", "industry option")
+
+    def _total_pages(self, driver):
+        page_info = self.waits.until(
+            driver, EC.presence_of_element_located((By.CSS_SELECTOR, PAGE_INFO_SELECTOR)), "page indicator")
+        match = re.search(r'Page \d+ of (\d+)', page_info.text)
+        return int(match.group(1)) if match else 1
+
+    def _next_page(self, driver):
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        self._click_and_wait_for_table(driver, "//span[contains(text(), 'Next')]", "next page",
+                                       required=True)
+
+    def _scrape_spec(self, spec):
+        """
+        Scrape every page of one spec in its own session. When a page change
+        times out, pagination stops and the rows collected so far are kept,
+        as the original screener scripts did.
+
+        Returns:
+            list: Table rows with Market and Sector added
+        """
+        with self.driver_pool.driver() as driver:
+            try:
+                self._apply_spec(driver, spec)
+                total_pages = self._total_pages(driver)
+                rows = []
+                for page in range(1, total_pages + 1):
+                    for row in extract_main_table(driver, TABLE_ID):
+                        row.update({"Market": spec.market, "Sector": spec.sector})
+                        rows.append(row)
+                    print(f"{spec.market} / {spec.industry}: processed page {page} of {total_pages}")
+                    if page < total_pages:
+                        try:
+                            self._next_page(driver)
+                        except TimeoutException:
+                            print(f"{spec.market} / {spec.industry}: timeout while moving to page {page + 1}, "
+                                  f"keeping {len(rows)} rows from {page} pages")
+                            break
+                return rows
+            finally:
+                self.popups.collect(driver)
+
+    def run(self, specs, output_file=None):
+        """
+        Scrape every spec, merge the rows and de-duplicate them by Symbol.
+
+        Returns:
+            pandas.DataFrame: Merged screener rows
+        """
+        start = time.time()
+        rows = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self._scrape_spec, spec) for spec in specs]
+            # Merge in spec order so de-duplication keeps the first spec's row
+            for spec, future in zip(specs, futures):
+                try:
+                    rows.extend(future.result())
+                except Exception as e:
+                    print(f"Screener spec {spec} failed: {str(e)}")
+
+        self.driver_pool.close()
+        df = pd.DataFrame(rows)
+        if not df.empty:
+            df = df.drop_duplicates(subset=['Symbol'], keep='first').reset_index(drop=True)
+        print(f"Screener collected {len(df)} unique symbols from {len(specs)} specs "
+              f"in {time.time() - start:.1f}s")
+        self.waits.print_summary()
+        self.popups.print_summary()
+        self.driver_pool.print_summary()
+        if output_file:
+            df.to_csv(output_file, index=False)
+            print(f"Saved screener results to {output_file}")
+        return df
+
+
+def main():
+    CHROMEDRIVER_PATH = "C:/Users/pulkit.kushwaha/Downloads/chromedriver-win64/chromedriver-win64/chromedriver.exe"
+    OUTPUT_FILE = "C:/Users/pulkit.kushwaha/Downloads/stock_analysis_screener_usa_otc_usa.csv"
+    MAX_WORKERS = 4
+
+    specs = [ScreenerSpec(market, 'Healthcare', industry)
+             for market in ('US', 'US OTC')
+             for industry in ('Biotechnology', 'Drug Manufacturers - Specialty & Generic')]
+    ScreenerEngine(CHROMEDRIVER_PATH, max_workers=MAX_WORKERS).run(specs, OUTPUT_FILE)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+Screener Helpers
+Created on Sun Oct 18 11:20:55 2026
+@author: pulkit.kushwaha
+
+Helpers shared by the stockanalysis.com screener scripts.
+"""
+
+import re
+import threading
+import time
+from collections import defaultdict
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import (TimeoutException, WebDriverException,
+                                        ElementClickInterceptedException, ElementNotInteractableException)
+
+from stock_analysis_browser_profile import apply_resource_blocking
+
+# Serializes the whole screener table in the browser so a page costs one
+# WebDriver round-trip instead of one per row, cell and link.
+EXTRACT_TABLE_JS = """
+const table = document.getElementById(arguments[0]);
+if (!table) { return null; }
+const rows = Array.from(table.querySelectorAll('tr'));
+if (!rows.length) { return null; }
+const headers = Array.from(rows[0].querySelectorAll('th')).map(th => th.innerText);
+const data = [];
+for (const row of rows.slice(1)) {
+    const cells = Array.from(row.querySelectorAll('td'));
+    if (!cells.length) { continue; }
+    const link = cells[0].querySelector('a');
+    data.push({cells: cells.map(td => td.innerText), link: link ? link.href : null});
+}
+return {headers: headers, rows: data};
+"""
+
+
+def extract_main_table(driver, table_id='main-table'):
+    """
+    Read the screener table in a single execute_script call.
+
+    Returns:
+        list: One dict per row mapping header -> cell text, plus "Link"
+        holding the first column's href
+    """
+    result = driver.execute_script(EXTRACT_TABLE_JS, table_id)
+    if not result:
+        return []
+    headers = result['headers']
+    table_data = []
+    for row in result['rows']:
+        row_data = dict(zip(headers, row['cells']))
+        if row['link']:
+            row_data["Link"] = row['link']
+        table_data.append(row_data)
+    return table_data
+
+
+PAGE_INFO_SELECTOR = 'div.rows-wrap span.whitespace-nowrap'
+
+# Page indicator text, first row's symbol and row count, used to tell when
+# the table has actually been redrawn.
+TABLE_STATE_JS = """
+const info = document.querySelector(arguments[1]);
+const table = document.getElementById(arguments[0]);
+const rows = table ? table.querySelectorAll('tbody tr') : [];
+const first = rows.length ? rows[0].querySelector('td') : null;
+return [info ? info.innerText : '', first ? first.innerText : '', rows.length];
+"""
+
+
+def table_state(driver, table_id='main-table'):
+    """Return (page indicator text, first row symbol, row count) of the screener table."""
+    return tuple(driver.execute_script(TABLE_STATE_JS, table_id, PAGE_INFO_SELECTOR))
+
+
+def table_changed(previous_state, table_id='main-table'):
+    """Wait condition: the table shows rows and differs from previous_state."""
+    def condition(driver):
+        state = table_state(driver, table_id)
+        return state if state[2] and state != previous_state else False
+    return condition
+
+
+class WaitTimer:
+    def __init__(self, timeout=10, poll_frequency=0.1):
+        """
+        Explicit waits on readiness signals that record how long each took.
+
+        Args:
+            timeout (int): Default timeout in seconds
+            poll_frequency (float): Seconds between condition checks
+        """
+        self.timeout = timeout
+        self.poll_frequency = poll_frequency
+        self.waits = defaultdict(list)
+        self.timeouts = defaultdict(int)
+
+    def until(self, driver, condition, name, timeout=None, required=True):
+        """
+        Wait for condition and record the time under name. When required is
+        False a timeout is recorded and None returned instead of raising.
+        """
+        start = time.time()
+        try:
+            result = WebDriverWait(driver, timeout or self.timeout,
+                                   poll_frequency=self.poll_frequency).until(condition)
+        except TimeoutException:
+            self.timeouts[name] += 1
+            self.waits[name].append(time.time() - start)
+            if required:
+                raise
+            print(f"Timed out waiting for {name}, continuing")
+            return None
+        self.waits[name].append(time.time() - start)
+        return result
+
+    def print_summary(self):
+        total = sum(sum(durations) for durations in self.waits.values())
+        print(f"Waited {total:.1f}s in total")
+        for name, durations in self.waits.items():
+            print(f"  {name}: {len(durations)} waits, avg {sum(durations) / len(durations):.2f}s, "
+                  f"max {max(durations):.2f}s, {self.timeouts[name]} timeouts")
+
+
+NEWSLETTER_URL_PATTERNS = ["*newsletter*", "*/api/subscribe*", "*convertkit*", "*mailchimp*"]
+
+# Installed before any page script runs: closes newsletter dialogs as soon as
+# they are inserted, so nothing has to poll for them from Python.
+POPUP_SUPPRESS_JS = """
+(() => {
+    const isNewsletter = el => /newsletter|subscribe/i.test(el.innerText || '');
+    const suppress = () => {
+        document.querySelectorAll('div[aria-modal="true"]').forEach(popup => {
+            if (popup.dataset.suppressed || !isNewsletter(popup)) { return; }
+            popup.dataset.suppressed = '1';
+            const close = popup.querySelector('button[aria-label="Close"]');
+            if (close) { close.click(); } else { popup.remove(); }
+            window.__popupsSuppressed = (window.__popupsSuppressed || 0) + 1;
+        });
+    };
+    new MutationObserver(suppress).observe(document, {childList: true, subtree: true});
+})();
+"""
+
+INTERACTION_ERRORS = (ElementClickInterceptedException, ElementNotInteractableException)
+
+
+class PopupSuppressor:
+    def __init__(self, blocked_patterns=None):
+        """
+        Suppress the newsletter popup without a polling thread.
+
+        Args:
+            blocked_patterns (list): URL patterns blocked through DevTools,
+                newsletter endpoints by default
+        """
+        self.blocked_patterns = blocked_patterns if blocked_patterns is not None else NEWSLETTER_URL_PATTERNS
+        self.lock = threading.Lock()
+        self.suppressed = 0
+        self.dismissals = 0
+
+    def install(self, driver):
+        """Inject the suppression script into every future document and block newsletter endpoints."""
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": POPUP_SUPPRESS_JS})
+        if self.blocked_patterns:
+            apply_resource_blocking(driver, self.blocked_patterns)
+
+    def collect(self, driver):
+        """
+        Add the current document's suppression count to the totals. The count
+        lives in the document, so this must run before every navigation
+        (see navigate) and once when a session is done with the page.
+        """
+        try:
+            count = driver.execute_script(
+                "const n = window.__popupsSuppressed || 0; window.__popupsSuppressed = 0; return n;")
+        except WebDriverException:
+            return
+        with self.lock:
+            self.suppressed += count
+
+    def navigate(self, driver, url):
+        """driver.get(url), keeping the count of the document being replaced."""
+        self.collect(driver)
+        driver.get(url)
+
+    def dismiss(self, driver):
+        """
+        One-shot dismissal of an open newsletter modal. Other modals, such
+        as the screener's filter dialog, are left alone.
+
+        Returns:
+            bool: True if a popup was closed
+        """
+        try:
+            popups = [popup for popup in driver.find_elements(By.CSS_SELECTOR, 'div[aria-modal="true"]')
+                      if re.search(r'newsletter|subscribe', popup.text, re.IGNORECASE)]
+            if not popups:
+                return False
+            popups[0].find_element(By.CSS_SELECTOR, 'button[aria-label="Close"]').click()
+        except WebDriverException:
+            return False
+        with self.lock:
+            self.dismissals += 1
+        print("Popup dismissed after a failed interaction")
+        return True
+
+    def click(self, driver, element):
+        """Click element; if something is in the way, dismiss popups once and retry."""
+        try:
+            element.click()
+        except INTERACTION_ERRORS:
+            if not self.dismiss(driver):
+                raise
+            element.click()
+
+    def print_summary(self):
+        print(f"Popups: {self.suppressed} suppressed by the injected script, "
+              f"{self.dismissals} dismissed after failed interactions")
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+"""
+SQLite Helpers
+Created on Sun Oct 18 23:41:26 2026
+@author: pulkit.kushwaha
+
+Connection handling shared by the SQLite state files: the output manifest,
+the negative cache, the work journal and the combine state.
+"""
+
+import sqlite3
+from contextlib import contextmanager
+
+
+@contextmanager
+def connect(path, timeout=30, immediate=False):
+    """
+    Connection that commits on success and is always closed.
+
+    Args:
+        path (str): SQLite file
+        timeout (float): Seconds to wait for a lock held by another process
+        immediate (bool): Take the write lock up front, so read-then-update
+            transactions are atomic across processes
+    """
+    conn = sqlite3.connect(path, timeout=timeout)
+    try:
+        with conn:
+            if immediate:
+                conn.execute("BEGIN IMMEDIATE")
+            yield conn
+    finally:
+        conn.close()
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Value Normalization
+Created on Sun Oct 18 21:48:52 2026
+@author: pulkit.kushwaha
+
+Turns scraped cell texts such as "25,070,000", "7.805%", "-" and "Upgrade"
+into numbers a whole column at a time. Thousands separators are stripped,
+percentages keep their value in percent with an is_percent flag,
+placeholders become NA, and paywalled cells become NA with a paywalled
+flag. The per-ticker CSVs keep the text as scraped; the dataset and the
+combine engine normalize when they ingest it.
+"""
+
+import numpy as np
+import pandas as pd
+
+PLACEHOLDERS = ('-', '', 'nan', 'None')
+PAYWALL_MARKER = 'Upgrade'
+# Largest magnitude a float64 holds as an exact integer
+_EXACT_INTEGER_LIMIT = 2 ** 53
+
+
+def as_integers(values):
+    """Values as nullable Int64 when every value is a whole number, else unchanged."""
+    finite = values.dropna()
+    if ((finite == np.floor(finite)) & (finite.abs() < _EXACT_INTEGER_LIMIT)).all():
+        return values.astype('Int64')
+    return values
+
+
+def normalize_values(texts, integers=False):
+    """
+    Numeric values of a column of cell texts.
+
+    Args:
+        texts (iterable): Cell texts; None and NaN count as placeholders
+        integers (bool): Return nullable Int64 values when every value is
+            a whole number, float64 otherwise
+
+    Returns:
+        DataFrame: value (float64 or Int64), is_percent (bool) and
+        paywalled (bool), aligned with texts
+    """
+    texts = pd.Series(texts, dtype=object)
+    text = texts.where(texts.notna(), '').astype(str).str.strip()
+    numeric = text.str.replace(',', '', regex=False).str.rstrip('%')
+    numeric = numeric.where(~numeric.isin(PLACEHOLDERS + (PAYWALL_MARKER,)))
+    values = pd.to_numeric(numeric, errors='coerce').astype('float64')
+    if integers:
+        values = as_integers(values)
+    return pd.DataFrame({
+        'value': values.values,
+        'is_percent': text.str.endswith('%').values,
+        'paywalled': (text == PAYWALL_MARKER).values,
+    }, index=texts.index)
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""
+Work Journal
+Created on Sun Oct 18 16:24:09 2026
+@author: pulkit.kushwaha
+
+Durable per-ticker, per-report work queue in SQLite (WAL mode). Every report
+moves pending -> in_flight -> done, or back to pending with the error when
+it will be retried, or to failed with the reason once it is given up. A
+restarted run resumes the unfinished items of the previous run; in-flight
+items of a crashed process are reclaimed once their lease expires. Several
+processes can share one journal and claim disjoint batches from it.
+
+Usage:
+    python stock_analysis_work_journal.py status <journal_file>
+"""
+
+import os
+import socket
+import sys
+import threading
+import time
+
+from stock_analysis_sqlite import connect
+
+REPORT_TYPES = ('quarterly', 'annual')
+STATES = ('pending', 'in_flight', 'done', 'failed')
+
+
+class WorkJournal:
+    def __init__(self, journal_file, lease_seconds=900, owner=None, wal=None):
+        """
+        Open (creating if needed) the journal.
+
+        Args:
+            journal_file (str): SQLite file holding the queue
+            lease_seconds (int): How long a claim is valid before another
+                run may reclaim the item
+            owner (str): Identifies this process in leases, host:pid by default
+            wal (bool): Switch the file to WAL (True) or rollback journal
+                (False) mode. None keeps the mode the file already uses and
+                creates new files in WAL mode. WAL needs shared memory, so
+                journals on network filesystems must use False.
+        """
+        self.journal_file = journal_file
+        self.lease_seconds = lease_seconds
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+        self.lock = threading.Lock()
+        if wal is None and not os.path.exists(journal_file):
+            wal = True
+        with self._connect() as conn:
+            if wal is not None:
+                conn.execute(f"PRAGMA journal_mode={'WAL' if wal else 'DELETE'}")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    ticker TEXT NOT NULL,
+                    report_type TEXT NOT NULL,
+                    link TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    reason TEXT,
+                    lease_owner TEXT,
+                    lease_expires REAL,
+                    updated_at REAL,
+                    PRIMARY KEY (ticker, report_type)
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state)")
+
+    def _connect(self, immediate=False):
+        # immediate makes read-then-update claims atomic across processes
+        return connect(self.journal_file, timeout=60, immediate=immediate)
+
+    @staticmethod
+    def ticker_of(link):
+        return link.split('/')[-2].upper()
+
+    def start_run(self, links):
+        """
+        Queue links for this run and return the links that still have work.
+
+        If the previous run left pending or in-flight items it is resumed:
+        finished items keep their state and new links are added. Otherwise
+        the journal is cleared and a new run starts.
+        """
+        now = time.time()
+        rows = [(self.ticker_of(link), report_type, link, now)
+                for link in links for report_type in REPORT_TYPES]
+        with self.lock, self._connect(immediate=True) as conn:
+            unfinished = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE state IN ('pending', 'in_flight')").fetchone()[0]
+            if unfinished:
+                print(f"Resuming previous run with {unfinished} unfinished reports")
+            else:
+                conn.execute("DELETE FROM jobs")
+            conn.executemany("""
+                INSERT OR IGNORE INTO jobs (ticker, report_type, link, state, updated_at)
+                VALUES (?, ?, ?, 'pending', ?)""", rows)
+            leased = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE state = 'in_flight' AND lease_expires > ?",
+                (now,)).fetchone()[0]
+            todo = conn.execute("""
+                SELECT link FROM jobs
+                WHERE state = 'pending' OR (state = 'in_flight' AND lease_expires <= ?)
+                GROUP BY link ORDER BY MIN(rowid)""", (now,)).fetchall()
+        if leased:
+            print(f"{leased} reports are leased by another run and are skipped until the lease expires")
+        return [row[0] for row in todo]
+
+    def claim(self, link, report_types=REPORT_TYPES):
+        """
+        Lease the reports of link that are pending, or in flight with an
+        expired lease or under this process's own lease, which is renewed.
+        Returns the claimed report types.
+        """
+        ticker = self.ticker_of(link)
+        now = time.time()
+        placeholders = ", ".join("?" * len(report_types))
+        with self.lock, self._connect(immediate=True) as conn:
+            conn.executemany("""
+                INSERT OR IGNORE INTO jobs (ticker, report_type, link, state, updated_at)
+                VALUES (?, ?, ?, 'pending', ?)""",
+                [(ticker, report_type, link, now) for report_type in report_types])
+            claimable = [row[0] for row in conn.execute(f"""
+                SELECT report_type FROM jobs
+                WHERE ticker = ? AND report_type IN ({placeholders})
+                  AND (state = 'pending' OR (state = 'in_flight'
+                       AND (lease_expires <= ? OR lease_owner = ?)))""",
+                (ticker, *report_types, now, self.owner)).fetchall()]
+            # Renewing our own lease (e.g. an item of a claimed batch) is not a new attempt
+            conn.executemany("""
+                UPDATE jobs SET
+                    attempts = CASE WHEN state = 'in_flight' AND lease_owner = ?
+                                    THEN attempts ELSE attempts + 1 END,
+                    state = 'in_flight', lease_owner = ?, lease_expires = ?, updated_at = ?
+                WHERE ticker = ? AND report_type = ?""",
+                [(self.owner, self.owner, now + self.lease_seconds, now, ticker, report_type)
+                 for report_type in claimable])
+        return [report_type for report_type in report_types if report_type in claimable]
+
+    def claim_batch(self, batch_size=10):
+        """
+        Lease every claimable report of up to batch_size links in one
+        transaction. Returns the links, in queue order.
+        """
+        now = time.time()
+        claimable = "state = 'pending' OR (state = 'in_flight' AND lease_expires <= ?)"
+        with self.lock, self._connect(immediate=True) as conn:
+            links = [row[0] for row in conn.execute(f"""
+                SELECT link FROM jobs WHERE {claimable}
+                GROUP BY link ORDER BY MIN(rowid) LIMIT ?""", (now, batch_size)).fetchall()]
+            conn.executemany(f"""
+                UPDATE jobs SET state = 'in_flight', attempts = attempts + 1,
+                    lease_owner = ?, lease_expires = ?, updated_at = ?
+                WHERE link = ? AND ({claimable})""",
+                [(self.owner, now + self.lease_seconds, now, link, now) for link in links])
+        return links
+
+    def _set_state(self, ticker, report_types, state, reason=None):
+        placeholders = ", ".join("?" * len(report_types))
+        with self.lock, self._connect() as conn:
+            conn.execute(f"""
+                UPDATE jobs SET state = ?, reason = ?, lease_expires = NULL, updated_at = ?
+                WHERE ticker = ? AND report_type IN ({placeholders}) AND state != 'done'""",
+                (state, reason, time.time(), ticker, *report_types))
+
+    def complete(self, ticker, report_type):
+        """Mark a report done."""
+        self.complete_many([(ticker, report_type)])
+
+    def complete_many(self, reports):
+        """Mark several (ticker, report_type) reports done in one transaction."""
+        now = time.time()
+        with self.lock, self._connect() as conn:
+            conn.executemany("""
+                UPDATE jobs SET state = 'done', reason = NULL, lease_expires = NULL, updated_at = ?
+                WHERE ticker = ? AND report_type = ?""",
+                [(now, ticker, report_type) for ticker, report_type in reports])
+
+    def release(self, ticker, report_types, reason):
+        """Return claimed reports to pending after a failed attempt that will be retried."""
+        self._set_state(ticker, report_types, 'pending', reason)
+
+    def fail(self, ticker, reason, report_types=REPORT_TYPES):
+        """Give up on the unfinished reports of ticker, keeping the reason."""
+        self._set_state(ticker, report_types, 'failed', reason)
+
+    def counts(self):
+        """Number of reports per state."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        counts = dict.fromkeys(STATES, 0)
+        counts.update(rows)
+        return counts
+
+    def done_by_owner(self, since=0.0):
+        """Reports finished since the given time, per process that held the last lease."""
+        with self._connect() as conn:
+            return dict(conn.execute("""
+                SELECT lease_owner, COUNT(*) FROM jobs
+                WHERE state = 'done' AND updated_at >= ? GROUP BY lease_owner""", (since,)).fetchall())
+
+    def done_reports(self):
+        """(ticker, report_type) of every finished report."""
+        with self._connect() as conn:
+            return conn.execute("SELECT ticker, report_type FROM jobs WHERE state = 'done'").fetchall()
+
+    def failures(self):
+        """(ticker, report_type, attempts, reason) of every failed report."""
+        with self._connect() as conn:
+            return conn.execute("""
+                SELECT ticker, report_type, attempts, reason FROM jobs
+                WHERE state = 'failed' ORDER BY ticker, report_type""").fetchall()
+
+    def print_summary(self):
+        counts = self.counts()
+        print("Work journal: " + ", ".join(f"{counts[state]} {state}" for state in STATES))
+        for ticker, report_type, attempts, reason in self.failures():
+            print(f"  FAILED {ticker} {report_type} after {attempts} attempts: {reason}")
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1] != "status":
+        print(__doc__)
+        return
+    WorkJournal(sys.argv[2]).print_summary()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+Distributed Scraping Tests
+Created on Sun Oct 18 22:58:31 2026
+@author: pulkit.kushwaha
+
+Runs the coordinator with local workers against a temporary fixture folder,
+so no live site or browser is needed, and checks the shared work journal
+and the output folder.
+
+Usage:
+    python -m pytest -q test_stock_analysis_distributed.py
+"""
+
+import os
+import subprocess
+import sys
+
+import pandas as pd
+
+from stock_analysis_fixture_server import save_fixture
+from stock_analysis_parser import CURRENCY_DIV_CLASS
+from stock_analysis_work_journal import WorkJournal
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCRAPED = ('AAA', 'BBB', 'CCC', 'DDD')
+# No fixture pages, so every report is a 404
+MISSING = ('ZZZ',)
+
+
+def financials_page():
+    """A raw-units financials page in the layout the parser expects."""
+    return f"""<html><body>
+<div class="{CURRENCY_DIV_CLASS}">Financials in USD. Fiscal year is January - December.</div>
+<table>
+<tr><th>Fiscal Quarter</th><th>Q2 2024</th><th>Q1 2024</th></tr>
+<tr><th>Period Ending</th><th>Jun '24 Jun 30, 2024</th><th>Mar '24 Mar 31, 2024</th></tr>
+<tr><td>Revenue</td><td>25,070,000</td><td>24,100,000</td></tr>
+<tr><td>Net Income</td><td>1,200,000</td><td>-</td></tr>
+</table></body></html>"""
+
+
+def link_of(ticker):
+    return f"https://stockanalysis.com/stocks/{ticker.lower()}/"
+
+
+def test_coordinator_with_local_workers(tmp_path):
+    fixtures = tmp_path / "fixtures"
+    for ticker in SCRAPED:
+        for report_type in ('quarterly', 'annual'):
+            save_fixture(str(fixtures), f"{link_of(ticker)}financials/?p={report_type}", financials_page())
+    input_file = tmp_path / "screener.csv"
+    pd.DataFrame({'Symbol': SCRAPED + MISSING,
+                  'Link': [link_of(ticker) for ticker in SCRAPED + MISSING]}).to_csv(input_file, index=False)
+    output = tmp_path / "output"
+    journal_file = tmp_path / "journal.sqlite"
+
+    result = subprocess.run(
+        [sys.executable, os.path.join(HERE, "stock_analysis_distributed.py"), "coordinator",
+         "--input", str(input_file), "--output", str(output), "--journal", str(journal_file),
+         "--fixtures", str(fixtures), "--workers", "2", "--threads", "2", "--batch-size", "2",
+         "--poll-interval", "0.5"],
+        cwd=str(tmp_path), capture_output=True, text=True, timeout=300)
+    assert result.returncode == 0, result.stdout + result.stderr
+
+    counts = WorkJournal(str(journal_file)).counts()
+    assert counts == {**counts, 'done': 2 * len(SCRAPED), 'failed': 2 * len(MISSING),
+                      'pending': 0, 'in_flight': 0}
+    for ticker in SCRAPED:
+        for report_type in ('quarterly', 'annual'):
+            df = pd.read_csv(output / f"{ticker}_{report_type}_financial_data.csv", header=[0, 1])
+            assert list(df.iloc[:, 0]) == ['Revenue', 'Net Income']
+    for ticker in MISSING:
+        assert not (output / f"{ticker}_quarterly_financial_data.csv").exists()
+
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+Browserless Fetch Tests
+Created on Sun Oct 18 23:12:44 2026
+@author: pulkit.kushwaha
+
+Serves saved financials pages from a temporary fixture folder and checks
+which ones the plain HTTP path accepts: raw tables as they are, scaled
+tables only when their raw values can be read from the page data.
+
+Usage:
+    python -m pytest -q test_stock_analysis_http_fetch.py
+"""
+
+from stock_analysis_fixture_server import FixtureServer, save_fixture
+from stock_analysis_http_fetch import HttpFetcher
+from stock_analysis_parser import CURRENCY_DIV_CLASS
+
+RAW_LINE = "Financials in USD. Fiscal year is October - September."
+SCALED_LINE = "Financials in millions USD. Fiscal year is October - September."
+# Unscaled numbers as the page data holds them; growth is a fraction
+PAGE_DATA = """<script>
+  const data = [null,{type:"data",data:{ticker:"aaa",financialData:{datekey:["2024-09-28","2023-09-30"],
+  fiscalYear:["2024","2023"],revenue:[391035000000,383285000000],revenueGrowth:[0.02022,-0.02801],
+  netIncome:[93736000000,null],epsBasic:[6.11,6.16]}},uses:{}}];
+</script>"""
+
+
+def financials_page(units_line=RAW_LINE, revenue=("391,035,000,000", "383,285,000,000"),
+                    net_income=("93,736,000,000", "-"), scripts=''):
+    """A financials page in the layout the parser expects, optionally without the units line."""
+    units = f'<div class="{CURRENCY_DIV_CLASS}">{units_line}</div>' if units_line else ''
+    return f"""<html><body>{units}
+<table>
+<tr><th>Fiscal Year</th><th>FY 2024</th><th>FY 2023</th><th>2018 - 2014</th></tr>
+<tr><th>Period Ending</th><th>Sep 28, 2024</th><th>Sep 30, 2023</th><th></th></tr>
+<tr><td>Revenue</td><td>{revenue[0]}</td><td>{revenue[1]}</td><td>Upgrade</td></tr>
+<tr><td>Revenue Growth (YoY)</td><td>2.02%</td><td>-2.80%</td><td>Upgrade</td></tr>
+<tr><td>Net Income</td><td>{net_income[0]}</td><td>{net_income[1]}</td><td>Upgrade</td></tr>
+<tr><td>EPS (Basic)</td><td>6.11</td><td>6.16</td><td>Upgrade</td></tr>
+</table>{scripts}</body></html>"""
+
+
+def scaled_page(scripts=PAGE_DATA, revenue=("391,035", "383,285")):
+    return financials_page(SCALED_LINE, revenue, ("93,736", "-"), scripts)
+
+
+def fetch_reports(folder, pages):
+    """Serve pages (ticker -> html) from folder and fetch each of them, plus a missing one."""
+    for ticker, html in pages.items():
+        save_fixture(str(folder), f"https://stockanalysis.com/stocks/{ticker}/financials/?p=annual", html)
+    with FixtureServer(str(folder)) as server:
+        fetcher = HttpFetcher(base_url=server.base_url)
+        return {ticker: fetcher.fetch_report(f"https://stockanalysis.com/stocks/{ticker}/financials/?p=annual")
+                for ticker in list(pages) + ['zzz']}
+
+
+def test_http_path_needs_a_raw_units_line(tmp_path):
+    results = fetch_reports(tmp_path, {'raw': financials_page(),
+                                       'scaled': scaled_page(scripts=''),
+                                       'no_units': financials_page(units_line=None)})
+    status, data = results['raw']
+    assert status == 200 and data is not None and len(data) == 4
+    assert results['scaled'] == (200, None)
+    assert results['no_units'] == (200, None)
+    assert results['zzz'] == (404, None)
+
+
+def test_scaled_table_takes_raw_values_from_page_data(tmp_path):
+    results = fetch_reports(tmp_path, {'raw': financials_page(), 'scaled': scaled_page(),
+                                       'mismatch': scaled_page(revenue=("391,036", "383,285"))})
+    raw, scaled = results['raw'][1], results['scaled'][1]
+    assert scaled is not None
+    # Same table as the Raw view, cell for cell
+    assert scaled.astype(str).values.tolist() == raw.astype(str).values.tolist()
+    assert list(scaled.columns) == list(raw.columns)
+    # A scaled row no page data series rounds to is left to the browser
+    assert results['mismatch'] == (200, None)